@@ -1,11 +1,31 @@
+import time
+
+_STARTED = time.perf_counter()
+
+import asyncio
 import os
+import warnings
 import disnake
 from disnake.ext import commands
 from dotenv import load_dotenv
 from datetime import datetime, timezone
 
+from utils import command_sync, http, metrics
+from utils.autoupdate import auto_update
+from utils.guild_stats import GuildStatsIndex
+from utils.startup import StartupReport
+from utils.watchdog import LoopWatchdog
+
 load_dotenv()
 TOKEN = os.getenv("DISCORD_TOKEN")
+AUTOUPDATE_TIMEOUT = float(os.getenv("AUTOUPDATE_TIMEOUT", "60"))
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0") or 0)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+# Event loop watchdog: stall threshold (0 disables it), and optional asyncio
+# debug mode logging callbacks slower than SLOW_CALLBACK_MS.
+WATCHDOG_THRESHOLD_MS = float(os.getenv("WATCHDOG_THRESHOLD_MS", "250"))
+SLOW_CALLBACK_MS = float(os.getenv("SLOW_CALLBACK_MS", "0"))
+FORCE_COMMAND_SYNC = os.getenv("FORCE_COMMAND_SYNC", "").lower() in {"1", "true", "yes"}
 
 intents = disnake.Intents.default()
 intents.message_content = False
@@ -13,16 +33,163 @@ intents.message_content = False
 sync_flags = commands.CommandSyncFlags.default()
 sync_flags.sync_commands_debug = True
 
-bot = commands.InteractionBot(
+
+class SerpentBot(commands.InteractionBot):
+    """InteractionBot that owns the shared HTTP session, times startup and flushes cogs on shutdown."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.startup = StartupReport(_STARTED)
+        self.guild_stats = GuildStatsIndex(self)
+        self.watchdog = None
+        if WATCHDOG_THRESHOLD_MS > 0:
+            self.watchdog = LoopWatchdog(
+                self,
+                threshold=WATCHDOG_THRESHOLD_MS / 1000,
+                slow_callback=SLOW_CALLBACK_MS / 1000 if SLOW_CALLBACK_MS > 0 else None,
+            )
+        self._update_task: asyncio.Task | None = None
+        self._closing = False
+        self.add_listener(self._on_first_connect, "on_connect")
+        for kind in ("slash", "user", "message"):
+            self.add_listener(metrics.command_started, f"on_{kind}_command")
+            self.add_listener(metrics.command_finished, f"on_{kind}_command_completion")
+
+    def load_extensions_timed(self, names: list[str]) -> None:
+        for ext in names:
+            t = time.perf_counter()
+            try:
+                self.load_extension(ext)
+                self.startup.extension(ext, time.perf_counter() - t)
+                print(f"Loaded extension: {ext}")
+            except Exception as e:
+                print(f"Failed to load {ext}: {e}")
+        self.startup.mark("extensions")
+
+    async def start(self, *args, **kwargs):
+        await http.open_session()
+        if METRICS_PORT:
+            await metrics.start(METRICS_PORT, METRICS_HOST)
+        if self.watchdog is not None:
+            self.watchdog.start()
+        await super().start(*args, **kwargs)
+
+    # Overridden rather than listened to: adding an *_error listener would
+    # suppress disnake's default traceback printing.
+    async def on_slash_command_error(self, inter, exception):
+        await metrics.command_finished(inter, exception)
+        if self.watchdog is not None:
+            self.watchdog.command_failed(inter)
+        await super().on_slash_command_error(inter, exception)
+
+    async def on_user_command_error(self, inter, exception):
+        await metrics.command_finished(inter, exception)
+        if self.watchdog is not None:
+            self.watchdog.command_failed(inter)
+        await super().on_user_command_error(inter, exception)
+
+    async def on_message_command_error(self, inter, exception):
+        await metrics.command_finished(inter, exception)
+        if self.watchdog is not None:
+            self.watchdog.command_failed(inter)
+        await super().on_message_command_error(inter, exception)
+
+    async def _on_first_connect(self):
+        self.startup.mark("login")
+        # The git check runs in the background once we're online, so a slow
+        # or hung network can no longer hold up startup.
+        if self._update_task is None:
+            self._update_task = asyncio.create_task(auto_update(AUTOUPDATE_TIMEOUT))
+
+    async def _prepare_application_commands(self) -> None:
+        # Runs once per start: fetch the registered commands, then sync. If
+        # the tree hash matches the last successful sync, skip both.
+        await self.wait_until_first_connect()
+        hashes = command_sync.command_hashes(self)
+        saved = command_sync.load_state()
+        if (
+            not FORCE_COMMAND_SYNC
+            and saved.get("application_id") == self.application_id
+            and saved.get("tree") == command_sync.tree_hash(hashes)
+        ):
+            print(f"[commands] Command tree unchanged ({len(hashes)} commands), skipping sync.")
+        else:
+            added, removed, changed = command_sync.diff(saved.get("commands", {}), hashes)
+            for label, keys in (("added", added), ("removed", removed), ("changed", changed)):
+                if keys:
+                    print(f"[commands] {label}: {', '.join(keys)}")
+            await super()._prepare_application_commands()
+        self.startup.mark("command sync")
+        self._maybe_report()
+
+    async def _sync_application_commands(self) -> None:
+        # Cog unloads during close() schedule delayed syncs; never push the
+        # shrinking tree to Discord (or record it) while shutting down.
+        if self._closing or self.is_closed():
+            return
+        if not (sync_flags.sync_global_commands or sync_flags.sync_guild_commands):
+            return await super()._sync_application_commands()
+
+        hashes = command_sync.command_hashes(self)
+        # disnake reports failed overwrites as SyncWarning instead of raising.
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            await super()._sync_application_commands()
+        failed = False
+        for w in caught:
+            if w.category.__name__ == "SyncWarning":
+                failed = True
+                print(f"[commands] Sync failed: {w.message}")
+            else:
+                warnings.warn_explicit(w.message, w.category, w.filename, w.lineno)
+
+        if not failed and not self.is_closed():
+            command_sync.save_state(self.application_id, hashes)
+
+    def _maybe_report(self) -> None:
+        if not self.startup.reported and self.startup.has("ready") and self.startup.has("command sync"):
+            self.startup.print()
+
+    async def close(self):
+        self._closing = True
+        # Give cogs a chance to finish async work (e.g. queued modlog sends)
+        # while the connection is still up.
+        for cog in list(self.cogs.values()):
+            shutdown = getattr(cog, "cog_shutdown", None)
+            if shutdown is not None:
+                try:
+                    await shutdown()
+                except Exception as e:
+                    print(f"Failed to shut down {cog.qualified_name}: {e}")
+        # Unload extensions first so each cog's cog_unload can flush its state.
+        for name in list(self.extensions):
+            try:
+                self.unload_extension(name)
+            except Exception as e:
+                print(f"Failed to unload {name}: {e}")
+        try:
+            await super().close()
+        finally:
+            if self.watchdog is not None:
+                self.watchdog.stop()
+            await metrics.stop()
+            await http.close_session()
+
+
+bot = SerpentBot(
     command_sync_flags=sync_flags,
     intents=intents,
 )
 
 bot.launch_time = datetime.now(timezone.utc)
 
+bot.startup.mark("import")
+
 @bot.event
 async def on_ready():
     print(f"Logged in as {bot.user} (id={bot.user.id})")
+    bot.startup.mark("ready")
+    bot._maybe_report()
     await bot.change_presence(activity=disnake.Game("Attention: This is not a drill."))
 
 initial_extensions = [
@@ -33,17 +200,9 @@ initial_extensions = [
     "cogs.info",
 ]
 
-for ext in initial_extensions:
-    try:
-        bot.load_extension(ext)
-        print(f"Loaded extension: {ext}")
-    except Exception as e:
-        print(f"Failed to load {ext}: {e}")
-
-from utils.autoupdate import auto_update
+bot.load_extensions_timed(initial_extensions)
 
 def main():
-    auto_update()
     bot.run(TOKEN)
 
 if __name__ == "__main__":
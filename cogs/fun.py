@@ -1,15 +1,52 @@
+import os
 import random
 import disnake
-from disnake.ext import commands
+from disnake.ext import commands, tasks
+from utils import metrics
 from utils.reddit import fetch_random_reddit_image
 from utils.http import _get_json
+from utils.prefetch import PrefetchBuffer
 
 CAT_FALLBACK_API = "https://api.thecatapi.com/v1/images/search"
 MEME_FALLBACK_API = "https://meme-api.com/gimme"
+DOG_API = "https://random.dog/woof.json"
+DOG_VIDEO_EXTS = (".mp4", ".webm", ".mov")
+
+# Background dog buffer: how many image URLs to keep ready, and how many to
+# fetch every DOG_REFILL_SECONDS while it isn't full.
+DOG_BUFFER_SIZE = int(os.getenv("DOG_BUFFER_SIZE", "8"))
+DOG_REFILL_SECONDS = float(os.getenv("DOG_REFILL_SECONDS", "5"))
+DOG_REFILL_BATCH = int(os.getenv("DOG_REFILL_BATCH", "2"))
+
+
+async def _fetch_dog_image() -> str | None:
+    """One random.dog URL, or None if the API failed or returned a video."""
+    # Not coalesced: a /fun dog overlapping a buffer refill must not get
+    # the same random URL the refill is about to store.
+    data = await _get_json(DOG_API, coalesce=False)
+    url = data.get("url") if data else None
+    if not url or url.lower().endswith(DOG_VIDEO_EXTS):
+        return None
+    return url
+
 
 class Fun(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.dog_buffer = PrefetchBuffer(_fetch_dog_image, maxsize=DOG_BUFFER_SIZE)
+        metrics.register_cache("dog_buffer", self.dog_buffer.stats)
+        self.refill_dogs.start()
+
+    def cog_unload(self):
+        self.refill_dogs.cancel()
+
+    @tasks.loop(seconds=DOG_REFILL_SECONDS)
+    async def refill_dogs(self):
+        await self.dog_buffer.fill(DOG_REFILL_BATCH)
+
+    @refill_dogs.before_loop
+    async def _before_refill_dogs(self):
+        await self.bot.wait_until_ready()
 
     @commands.slash_command(name="fun", description="Fun & entertainment commands")
     async def fun_group(self, inter: disnake.ApplicationCommandInteraction):
@@ -31,11 +68,12 @@ class Fun(commands.Cog):
             sort=sort,
             t=time,
             allow_nsfw=allow_nsfw,
+            channel_id=inter.channel_id,
         )
 
         # If Reddit fails, fallback to TheCatAPI
         if img_url is None:
-            data = await _get_json(CAT_FALLBACK_API)
+            data = await _get_json(CAT_FALLBACK_API, coalesce=False)
             if data and isinstance(data, list) and data[0].get("url"):
                 img_url = data[0]["url"]
 
@@ -51,11 +89,10 @@ class Fun(commands.Cog):
     @commands.cooldown(1, 3, commands.BucketType.user)
     async def dog(self, inter: disnake.ApplicationCommandInteraction):
         await inter.response.defer()
-        data = await _get_json("https://random.dog/woof.json")
-        url = data.get("url") if data else None
-        if url and any(url.lower().endswith(v) for v in (".mp4",".webm",".mov")):
-            data = await _get_json("https://random.dog/woof.json")
-            url = data.get("url") if data else None
+        # Buffered URL if we have one, otherwise a live fetch (one re-roll on video).
+        url = self.dog_buffer.get()
+        if url is None:
+            url = await _fetch_dog_image() or await _fetch_dog_image()
         if not url:
             return await inter.edit_original_response("Dog API had a moment.")
         embed = disnake.Embed(title="🐶 Woof", color=disnake.Color.blurple())
@@ -76,11 +113,12 @@ class Fun(commands.Cog):
             sort="hot",
             t="day",
             allow_nsfw=False,
+            channel_id=inter.channel_id,
         )
 
         # If Reddit fails, try meme-api
         if img_url is None:
-            data = await _get_json(MEME_FALLBACK_API)
+            data = await _get_json(MEME_FALLBACK_API, coalesce=False)
             if data and data.get("url"):
                 img_url = data["url"]
 
@@ -4,6 +4,9 @@ from datetime import datetime, timezone
 import disnake
 from disnake.ext import commands
 
+from utils.persist import writer_stats
+from utils.reddit import ua_stats
+
 
 class Info(commands.Cog):
     """General information commands like /stats and /help."""
@@ -47,10 +50,16 @@ class Info(commands.Cog):
         )
         embed.add_field(name="Uptime", value=uptime_str, inline=True)
         embed.add_field(name="Latency", value=f"{latency_ms} ms", inline=True)
+        totals = self.bot.guild_stats.totals()
         embed.add_field(name="Servers", value=str(len(self.bot.guilds)), inline=True)
         embed.add_field(
-            name="Users (approx.)",
-            value=str(len(self.bot.users)),
+            name="Members (all servers)",
+            value=str(totals["members"]),
+            inline=True,
+        )
+        embed.add_field(
+            name="Channels",
+            value=str(totals["channels"]),
             inline=True,
         )
         embed.add_field(
@@ -63,6 +72,44 @@ class Info(commands.Cog):
             value=disnake.__version__,
             inline=True,
         )
+
+        fun_cog = self.bot.get_cog("Fun")
+        if fun_cog is not None:
+            dog = fun_cog.dog_buffer.stats()
+            embed.add_field(
+                name="Dog buffer",
+                value=f"{dog['depth']}/{dog['maxsize']} ready • {dog['hit_ratio']:.0%} hit rate",
+                inline=True,
+            )
+
+        ua_lines = [
+            f"{name}: {s['recent_success_rate']:.0%} ({s['ok']}/{s['total']})"
+            for name, s in ua_stats().items()
+            if s["total"]
+        ]
+        if ua_lines:
+            embed.add_field(name="Reddit UAs", value="\n".join(ua_lines), inline=True)
+
+        writers = writer_stats().values()
+        if writers:
+            requests = sum(w["requests"] for w in writers)
+            writes = sum(w["writes"] for w in writers)
+            max_ms = max(w["max_latency"] for w in writers) * 1000
+            embed.add_field(
+                name="Disk writes",
+                value=f"{writes} writes for {requests} saves • max {max_ms:.0f} ms",
+                inline=True,
+            )
+
+        watchdog = getattr(self.bot, "watchdog", None)
+        if watchdog is not None:
+            wd = watchdog.stats()
+            embed.add_field(
+                name="Event loop",
+                value=f"{wd['stalls']} stalls • max lag {wd['max_lag'] * 1000:.0f} ms",
+                inline=True,
+            )
+
         embed.set_footer(text="Running on your friendly neighborhood Pi")
 
         await inter.edit_original_message(embed=embed)
@@ -110,7 +157,7 @@ class Info(commands.Cog):
         embed.add_field(
             name="🛡 Moderation",
             value=(
-                "`purge` – delete messages\n"
+                "`purge` – delete messages (with filters)\n"
                 "`slowmode` – set channel slowmode\n"
                 "`say` – bot sends a message\n"
                 "`kick` – kick a member\n"
@@ -120,6 +167,7 @@ class Info(commands.Cog):
                 "`clearwarnings` – clear warnings\n"
                 "`timeout` – timeout a member\n"
                 "`untimeout` – remove timeout\n"
+                "`massban/masskick/masstimeout` – raid cleanup\n"
                 "`modlog set/disable/show` – configure mod logs\n"
             ),
             inline=False,
@@ -1,49 +1,293 @@
-import json
+import asyncio
+import re
+import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import disnake
+import regex as regex_engine
 from disnake.ext import commands
 
+from utils.modlog_queue import ModlogQueue
+from utils.persist import DebouncedWriter, load_json
+from utils.warnings_store import open_warnings_store
+
 DATA_DIR = Path("data")
-WARN_FILE = DATA_DIR / "warnings.json"
 MODLOG_FILE = DATA_DIR / "modlog.json"
 
 
-# ------------- Warnings storage ------------- #
+# ------------- Modlog config storage ------------- #
 
-def _load_warnings() -> dict:
-    if not WARN_FILE.exists():
-        return {}
+def _modlog_mtime() -> float | None:
+    try:
+        return MODLOG_FILE.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+
+class ModlogConfig:
+    """
+    In-memory copy of modlog.json.
+
+    Loaded once, updated in place by set()/remove(), and reloaded only
+    if the file's mtime changes (checked at most every MTIME_CHECK_SECONDS).
+    Writes are debounced and atomic; see utils.persist.DebouncedWriter.
+    """
+
+    MTIME_CHECK_SECONDS = 5.0
+
+    def __init__(self):
+        self._data: dict = {}
+        self._mtime: float | None = None
+        self._checked_at = float("-inf")
+        self._loaded = False
+        self.writer = DebouncedWriter(MODLOG_FILE, lambda: self._data, indent=4, on_written=self._note_written)
+
+    def _note_written(self) -> None:
+        self._mtime = _modlog_mtime()
+
+    def reload_if_changed(self) -> bool:
+        """Reload if needed. Returns True if the data changed on disk."""
+        now = time.monotonic()
+        if self._loaded and now - self._checked_at < self.MTIME_CHECK_SECONDS:
+            return False
+        self._checked_at = now
+        mtime = _modlog_mtime()
+        # Unwritten local changes win over an external edit.
+        if self._loaded and (mtime == self._mtime or self.writer.dirty):
+            return False
+        self._data = load_json(MODLOG_FILE)
+        self._mtime = mtime
+        self._loaded = True
+        return True
+
+    def get(self, guild_id: int) -> int | None:
+        self.reload_if_changed()
+        return self._data.get(str(guild_id))
+
+    def set(self, guild_id: int, channel_id: int) -> None:
+        self.reload_if_changed()
+        self._data[str(guild_id)] = channel_id
+        self.writer.schedule()
+
+    def remove(self, guild_id: int) -> int | None:
+        self.reload_if_changed()
+        removed = self._data.pop(str(guild_id), None)
+        if removed is not None:
+            self.writer.schedule()
+        return removed
+
+
+# ------------- Warnings paginator ------------- #
+
+WARNINGS_PAGE_SIZE = 5
+
+
+def _warnings_embed(user: disnake.Member, items: list[dict], page_no: int, total: int) -> disnake.Embed:
+    pages = max(1, -(-total // WARNINGS_PAGE_SIZE))
+    embed = disnake.Embed(
+        title=f"Warnings for {user}",
+        color=disnake.Color.orange(),
+        timestamp=datetime.now(timezone.utc),
+    )
+    for idx, w in enumerate(items, start=page_no * WARNINGS_PAGE_SIZE + 1):
+        ts = w.get("timestamp")
+        try:
+            ts_parsed = datetime.fromisoformat(ts)
+            ts_str = disnake.utils.format_dt(ts_parsed, style="R")
+        except Exception:
+            ts_str = ts or "Unknown time"
+
+        mod_id = w.get("mod_id")
+        mod_mention = f"<@{mod_id}>" if mod_id else "Unknown"
+        reason = w.get("reason", "No reason.")
+
+        embed.add_field(
+            name=f"#{idx} • {ts_str}",
+            value=f"**Mod:** {mod_mention}\n**Reason:** {reason}"[:1024],
+            inline=False,
+        )
+    embed.set_footer(text=f"Page {page_no + 1}/{pages} • {total} warning(s)")
+    return embed
+
+
+class WarningsPaginator(disnake.ui.View):
+    """
+    Prev/Next buttons over a user's warnings.
+
+    Only the visible page is held; pages are loaded from the store on demand
+    via its cursors. The cursor that starts each visited page is remembered
+    so "Previous" can step back.
+    """
+
+    def __init__(self, store, author_id: int, guild_id: int, user: disnake.Member, total: int):
+        super().__init__(timeout=180)
+        self.store = store
+        self.author_id = author_id
+        self.guild_id = guild_id
+        self.user = user
+        self.total = total
+        self.page_no = 0
+        self.page_cursors: list = [None]  # start cursor of each visited page
+        self.next_cursor = None
+
+    async def load(self) -> disnake.Embed:
+        items, self.next_cursor = await self.store.page(
+            self.guild_id,
+            self.user.id,
+            self.page_cursors[self.page_no],
+            WARNINGS_PAGE_SIZE,
+        )
+        self.prev_page.disabled = self.page_no == 0
+        self.next_page.disabled = self.next_cursor is None
+        return _warnings_embed(self.user, items, self.page_no, self.total)
+
+    async def interaction_check(self, inter: disnake.MessageInteraction) -> bool:
+        if inter.author.id != self.author_id:
+            await inter.response.send_message("This isn't your paginator.", ephemeral=True)
+            return False
+        return True
+
+    @disnake.ui.button(label="◀ Previous", style=disnake.ButtonStyle.secondary)
+    async def prev_page(self, button: disnake.ui.Button, inter: disnake.MessageInteraction):
+        self.page_no = max(0, self.page_no - 1)
+        await inter.response.edit_message(embed=await self.load(), view=self)
+
+    @disnake.ui.button(label="Next ▶", style=disnake.ButtonStyle.secondary)
+    async def next_page(self, button: disnake.ui.Button, inter: disnake.MessageInteraction):
+        if self.next_cursor is not None:
+            self.page_no += 1
+            del self.page_cursors[self.page_no:]
+            self.page_cursors.append(self.next_cursor)
+        await inter.response.edit_message(embed=await self.load(), view=self)
+
+
+# ------------- Purge helpers ------------- #
+
+PURGE_MAX_DELETE = 5000
+PURGE_SCAN_LIMIT = 20000  # messages of history walked at most per run
+PURGE_PROGRESS_INTERVAL = 2.0
+BULK_DELETE_CHUNK = 100  # Discord's bulk delete limit
+# Bulk delete only accepts messages younger than 14 days; keep a margin.
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=5)
+_LINK_RE = re.compile(r"https?://\S+", re.IGNORECASE)
+# Total regex matching time allowed per /purge run. Matching runs on the
+# event loop, so this is a hard cap: the `regex` engine aborts a search
+# that overruns it (re can't be interrupted mid-match).
+PURGE_REGEX_BUDGET = 1.0
+CONTENT_FILTERS = ("attachments", "links", "contains", "regex")
+
+
+class PurgeRegexTooSlow(Exception):
+    pass
+
+
+def _purge_check(
+    *,
+    user: disnake.abc.User | None,
+    bots: bool,
+    attachments: bool,
+    links: bool,
+    contains: str | None,
+    regex: str | None,
+):
+    """
+    Predicate for /purge. All given filters must match.
+
+    Raises regex_engine.error for an invalid regex; the predicate raises
+    PurgeRegexTooSlow once the regex has used up PURGE_REGEX_BUDGET seconds,
+    including when a single search is cut off.
+    """
+    pattern = regex_engine.compile(regex) if regex else None
+    needle = contains.lower() if contains else None
+    regex_time = 0.0
+
+    def check(msg: disnake.Message) -> bool:
+        nonlocal regex_time
+        if msg.pinned:
+            return False
+        if user is not None and msg.author.id != user.id:
+            return False
+        if bots and not msg.author.bot:
+            return False
+        if attachments and not msg.attachments:
+            return False
+        if links and not _LINK_RE.search(msg.content):
+            return False
+        if needle is not None and needle not in msg.content.lower():
+            return False
+        if pattern is not None:
+            started = time.perf_counter()
+            try:
+                found = pattern.search(msg.content, timeout=max(0.0, PURGE_REGEX_BUDGET - regex_time))
+            except TimeoutError:
+                raise PurgeRegexTooSlow from None
+            finally:
+                regex_time += time.perf_counter() - started
+            if not found:
+                return False
+        return True
+
+    return check
+
+
+def _describe_purge_filters(**filters) -> str:
+    parts = []
+    for name, value in filters.items():
+        if value is True:
+            parts.append(name)
+        elif isinstance(value, disnake.abc.User):
+            parts.append(f"{name}: {value} ({value.id})")
+        elif value:
+            parts.append(f"{name}: `{value}`")
+    return "\n".join(parts)[:1024]
+
+
+# ------------- Bulk moderation helpers ------------- #
+
+MASS_CONCURRENCY = 3  # simultaneous API calls per mass action
+MASS_MAX_TARGETS = 1000
+MASS_PROGRESS_INTERVAL = 2.0
+_ID_RE = re.compile(r"\d{15,20}")
+
+
+async def _try_edit(inter: disnake.ApplicationCommandInteraction, **kwargs) -> bool:
+    """
+    edit_original_message that logs instead of raising. Long runs can
+    outlive the 15-minute interaction token; the work must carry on anyway.
+    """
     try:
-        with WARN_FILE.open("r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
+        await inter.edit_original_message(**kwargs)
+        return True
+    except disnake.HTTPException as e:
+        print(f"[moderation] Couldn't update progress for /{inter.application_command.qualified_name}: {e}")
+        return False
 
 
-def _save_warnings(data: dict) -> None:
-    DATA_DIR.mkdir(exist_ok=True)
-    with WARN_FILE.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
+def _parse_ids(text: str) -> list[int]:
+    """User IDs from a string of raw IDs and/or mentions, de-duplicated in order."""
+    return list(dict.fromkeys(int(m) for m in _ID_RE.findall(text or "")))
 
 
-# ------------- Modlog config storage ------------- #
+class MassActionView(disnake.ui.View):
+    """Cancel button for a running mass action; only its moderator can press it."""
 
-def _load_modlog() -> dict:
-    if not MODLOG_FILE.exists():
-        return {}
-    try:
-        with MODLOG_FILE.open("r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
+    def __init__(self, author_id: int):
+        super().__init__(timeout=None)
+        self.author_id = author_id
+        self.cancelled = asyncio.Event()
 
+    async def interaction_check(self, inter: disnake.MessageInteraction) -> bool:
+        if inter.author.id != self.author_id:
+            await inter.response.send_message("Only the moderator who started this can cancel it.", ephemeral=True)
+            return False
+        return True
 
-def _save_modlog(data: dict) -> None:
-    DATA_DIR.mkdir(exist_ok=True)
-    with MODLOG_FILE.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
+    @disnake.ui.button(label="Cancel", style=disnake.ButtonStyle.danger)
+    async def cancel(self, button: disnake.ui.Button, inter: disnake.MessageInteraction):
+        self.cancelled.set()
+        button.disabled = True
+        await inter.response.edit_message(view=self)
 
 
 class Moderation(commands.Cog):
@@ -51,31 +295,63 @@ class Moderation(commands.Cog):
 
     def __init__(self, bot: commands.InteractionBot):
         self.bot = bot
+        # Backend chosen by WARNINGS_BACKEND (sqlite by default).
+        self.warnings_store = open_warnings_store()
+        self.modlog_config = ModlogConfig()
+        # guild_id -> resolved modlog channel
+        self._modlog_channels: dict[int, disnake.abc.GuildChannel] = {}
+        self.modlog_queue = ModlogQueue(self._modlog_channel_for)
+
+    async def cog_shutdown(self):
+        # Called by the bot before it unloads cogs; cog_unload can't await.
+        await self.modlog_queue.flush()
+
+    def cog_unload(self):
+        self.modlog_queue.close()
+        self.modlog_config.writer.flush_sync()
+        self.warnings_store.close()
 
     # ------------- Internal helpers ------------- #
 
     async def _send_modlog(self, guild: disnake.Guild, embed: disnake.Embed) -> None:
-        """Send an embed to the configured modlog channel for this guild, if any."""
-        data = _load_modlog()
-        ch_id = data.get(str(guild.id))
-        if not ch_id:
+        """Queue an embed for this guild's modlog channel, if any. Never waits on Discord."""
+        if self._modlog_channel(guild) is None:
             return
+        self.modlog_queue.put(guild.id, embed)
 
-        channel = guild.get_channel(ch_id)
-        if channel is None:
-            return
+    def _modlog_channel_for(self, guild_id: int):
+        guild = self.bot.get_guild(guild_id)
+        return self._modlog_channel(guild) if guild is not None else None
 
-        try:
-            await channel.send(embed=embed)
-        except disnake.Forbidden:
-            # Bot can't send messages there; silently ignore.
-            pass
+    def _modlog_channel(self, guild: disnake.Guild):
+        """Resolve (and cache) the modlog channel for a guild. No disk reads once loaded."""
+        if self.modlog_config.reload_if_changed():
+            self._modlog_channels.clear()
+
+        ch_id = self.modlog_config.get(guild.id)
+        if not ch_id:
+            self._modlog_channels.pop(guild.id, None)
+            return None
+
+        channel = self._modlog_channels.get(guild.id)
+        if channel is None or channel.id != ch_id:
+            channel = guild.get_channel(ch_id)
+            if channel is None:
+                return None
+            self._modlog_channels[guild.id] = channel
+        return channel
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: disnake.abc.GuildChannel):
+        cached = self._modlog_channels.get(channel.guild.id)
+        if cached is not None and cached.id == channel.id:
+            self._modlog_channels.pop(channel.guild.id, None)
 
     # ------------- Basic moderation commands ------------- #
 
     @commands.slash_command(
         name="purge",
-        description="Delete a number of messages from this channel.",
+        description="Delete messages from this channel, optionally filtered.",
         dm_permission=False,
         default_member_permissions=disnake.Permissions(manage_messages=True),
     )
@@ -84,23 +360,128 @@ class Moderation(commands.Cog):
         inter: disnake.ApplicationCommandInteraction,
         amount: int = commands.Param(
             gt=0,
-            le=500,
-            description="How many messages to delete (max 500).",
+            le=PURGE_MAX_DELETE,
+            description=f"How many matching messages to delete (max {PURGE_MAX_DELETE}).",
+        ),
+        user: disnake.User = commands.Param(default=None, description="Only messages from this user."),
+        bots: bool = commands.Param(default=False, description="Only messages from bots."),
+        attachments: bool = commands.Param(default=False, description="Only messages with attachments."),
+        links: bool = commands.Param(default=False, description="Only messages containing links."),
+        contains: str = commands.Param(default=None, description="Only messages containing this text (case-insensitive)."),
+        regex: str = commands.Param(default=None, max_length=200, description="Only messages matching this regex."),
+        before: str = commands.Param(default=None, description="Only messages before this message ID."),
+        after: str = commands.Param(default=None, description="Only messages after this message ID."),
+        include_old: bool = commands.Param(
+            default=False,
+            description="Also delete messages older than 14 days (one by one, slow).",
         ),
     ):
         await inter.response.defer(ephemeral=True)
-        deleted = await inter.channel.purge(limit=amount)
-        count = len(deleted)
-        await inter.edit_original_message(f"🧹 Deleted **{count}** messages.")
+        used = dict(attachments=attachments, links=links, contains=contains, regex=regex)
+        if not self.bot.intents.message_content and any(used.values()):
+            # Without the message content intent Discord sends other users'
+            # messages with empty content and attachments, so these filters
+            # would silently match nothing.
+            names = ", ".join(f"`{k}`" for k in CONTENT_FILTERS if used[k])
+            return await inter.edit_original_message(
+                f"❌ {names} need the Message Content intent, which this bot runs without. "
+                "Filter by `user`, `bots` or `before`/`after` instead."
+            )
+        try:
+            before_obj = disnake.Object(int(before)) if before else None
+            after_obj = disnake.Object(int(after)) if after else None
+        except ValueError:
+            return await inter.edit_original_message("❌ `before`/`after` must be message IDs.")
+        try:
+            check = _purge_check(user=user, bots=bots, attachments=attachments, links=links, contains=contains, regex=regex)
+        except regex_engine.error as e:
+            return await inter.edit_original_message(f"❌ Invalid regex: {e}")
+
+        channel = inter.channel
+        cutoff = datetime.now(timezone.utc) - BULK_DELETE_MAX_AGE
+        scanned = deleted = 0
+        chunk: list[disnake.Message] = []
+        old: list[disnake.Message] = []
+        skipped_old = 0
+        last_update = time.monotonic()
+        live = True  # False once the interaction token stops accepting edits
+        note = ""
+
+        async def progress(note: str = "") -> None:
+            nonlocal live
+            if live:
+                live = await _try_edit(
+                    inter,
+                    content=f"🧹 Scanned **{scanned}** • deleted **{deleted}**/{amount}" + (f"\n{note}" if note else ""),
+                )
+
+        async def flush_chunk() -> None:
+            nonlocal deleted
+            if chunk:
+                await channel.delete_messages(chunk)
+                deleted += len(chunk)
+                chunk.clear()
+
+        await progress()
+        try:
+            # history() pages in 100s lazily, so only the messages we're
+            # looking at are ever held in memory.
+            async for msg in channel.history(limit=PURGE_SCAN_LIMIT, before=before_obj, after=after_obj):
+                scanned += 1
+                if check(msg):
+                    if msg.created_at > cutoff:
+                        chunk.append(msg)
+                    elif include_old:
+                        old.append(msg)
+                    else:
+                        skipped_old += 1
+                    if deleted + len(chunk) + len(old) >= amount:
+                        break
+                if len(chunk) >= BULK_DELETE_CHUNK:
+                    await flush_chunk()
+                if time.monotonic() - last_update >= PURGE_PROGRESS_INTERVAL:
+                    last_update = time.monotonic()
+                    await progress()
+            await flush_chunk()
+
+            # Bulk delete refuses messages older than 14 days; those go one
+            # at a time, which disnake paces to the per-route rate limit.
+            if include_old:
+                for msg in old:
+                    try:
+                        await msg.delete()
+                        deleted += 1
+                    except disnake.NotFound:
+                        pass
+                    if time.monotonic() - last_update >= PURGE_PROGRESS_INTERVAL:
+                        last_update = time.monotonic()
+                        await progress("Deleting messages older than 14 days...")
+        except disnake.Forbidden:
+            note = "❌ I don't have permission to delete messages here."
+        except PurgeRegexTooSlow:
+            await flush_chunk()
+            note = f"⚠️ Stopped early: the regex used more than {PURGE_REGEX_BUDGET:.0f}s of matching time."
+
+        if not note:
+            note = "✅ Done."
+        if skipped_old:
+            note += f" Skipped **{skipped_old}** message(s) older than 14 days (use `include_old`)."
+        await progress(note)
 
         embed = disnake.Embed(
             title="Messages Purged",
             color=disnake.Color.blurple(),
             timestamp=datetime.now(timezone.utc),
         )
-        embed.add_field("Channel", inter.channel.mention, inline=True)
+        embed.add_field("Channel", channel.mention, inline=True)
         embed.add_field("Moderator", f"{inter.author} ({inter.author.id})", inline=True)
-        embed.add_field("Amount", str(count), inline=True)
+        embed.add_field("Amount", str(deleted), inline=True)
+        filters = _describe_purge_filters(
+            user=user, bots=bots, attachments=attachments, links=links,
+            contains=contains, regex=regex, before=before, after=after,
+        )
+        if filters:
+            embed.add_field("Filters", filters, inline=False)
         await self._send_modlog(inter.guild, embed)
 
     @commands.slash_command(
@@ -274,19 +655,12 @@ class Moderation(commands.Cog):
                 ephemeral=True,
             )
 
-        data = _load_warnings()
-        guild_key = str(inter.guild.id)
-        user_key = str(user.id)
-        guild_warnings = data.setdefault(guild_key, {})
-        user_warnings = guild_warnings.setdefault(user_key, [])
-
         warning = {
             "mod_id": inter.author.id,
             "reason": reason,
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
-        user_warnings.append(warning)
-        _save_warnings(data)
+        count = await self.warnings_store.add(inter.guild.id, user.id, warning)
 
         if dm_user:
             try:
@@ -301,7 +675,6 @@ class Moderation(commands.Cog):
             except disnake.Forbidden:
                 pass
 
-        count = len(user_warnings)
         await inter.response.send_message(
             f"⚠️ Warned **{user}** for: `{reason}`.\n"
             f"This user now has **{count}** warning(s).",
@@ -330,40 +703,19 @@ class Moderation(commands.Cog):
         inter: disnake.ApplicationCommandInteraction,
         user: disnake.Member = commands.Param(description="Member to view warnings for."),
     ):
-        data = _load_warnings()
-        guild_warnings = data.get(str(inter.guild.id), {})
-        user_warnings = guild_warnings.get(str(user.id), [])
+        total = await self.warnings_store.count(inter.guild.id, user.id)
 
-        if not user_warnings:
+        if not total:
             return await inter.response.send_message(
                 f"✅ **{user}** has no warnings on record.",
                 ephemeral=True,
             )
 
-        embed = disnake.Embed(
-            title=f"Warnings for {user}",
-            color=disnake.Color.orange(),
-            timestamp=datetime.now(timezone.utc),
-        )
-        for idx, w in enumerate(user_warnings, start=1):
-            ts = w.get("timestamp")
-            try:
-                ts_parsed = datetime.fromisoformat(ts)
-                ts_str = disnake.utils.format_dt(ts_parsed, style="R")
-            except Exception:
-                ts_str = ts or "Unknown time"
-
-            mod_id = w.get("mod_id")
-            mod_mention = f"<@{mod_id}>" if mod_id else "Unknown"
-            reason = w.get("reason", "No reason.")
-
-            embed.add_field(
-                name=f"#{idx} • {ts_str}",
-                value=f"**Mod:** {mod_mention}\n**Reason:** {reason}",
-                inline=False,
-            )
-
-        await inter.response.send_message(embed=embed, ephemeral=True)
+        view = WarningsPaginator(self.warnings_store, inter.author.id, inter.guild.id, user, total)
+        embed = await view.load()
+        if total <= WARNINGS_PAGE_SIZE:
+            return await inter.response.send_message(embed=embed, ephemeral=True)
+        await inter.response.send_message(embed=embed, view=view, ephemeral=True)
 
     @commands.slash_command(
         name="clearwarnings",
@@ -376,25 +728,14 @@ class Moderation(commands.Cog):
         inter: disnake.ApplicationCommandInteraction,
         user: disnake.Member = commands.Param(description="Member whose warnings to clear."),
     ):
-        data = _load_warnings()
-        guild_key = str(inter.guild.id)
-        user_key = str(user.id)
-
-        guild_warnings = data.get(guild_key, {})
-        user_warnings = guild_warnings.get(user_key)
+        count = await self.warnings_store.clear(inter.guild.id, user.id)
 
-        if not user_warnings:
+        if not count:
             return await inter.response.send_message(
                 f"ℹ️ **{user}** has no warnings.",
                 ephemeral=True,
             )
 
-        count = len(user_warnings)
-        guild_warnings.pop(user_key, None)
-        if not guild_warnings:
-            data.pop(guild_key, None)
-        _save_warnings(data)
-
         await inter.response.send_message(
             f"🧽 Cleared **{count}** warning(s) for **{user}**.",
             ephemeral=True,
@@ -412,67 +753,67 @@ class Moderation(commands.Cog):
 
     # ------------- Timeouts ------------- #
 
-        @commands.slash_command(
+    @commands.slash_command(
         name="timeout",
         description="Timeout a member for a period of time.",
         dm_permission=False,
         default_member_permissions=disnake.Permissions(moderate_members=True),
     )
-        async def timeout(
-            self,
-            inter: disnake.ApplicationCommandInteraction,
-            user: disnake.Member = commands.Param(description="Member to timeout."),
-            minutes: int = commands.Param(
-                ge=1,
-                le=10080,  # up to 7 days
-                description="Duration in minutes (1–10080).",
-            ),
-            reason: str = commands.Param(
-                default="No reason provided.",
-                description="Reason for the timeout.",
-            ),
-        ):
-            if user == inter.author:
-                return await inter.response.send_message(
-                    "Timing yourself out is just called going to bed.",
-                    ephemeral=True,
-                )
-            if user == inter.guild.me:
-                return await inter.response.send_message(
-                    "I’m not timing myself out.",
-                    ephemeral=True,
-                )
-
-            duration = timedelta(minutes=minutes)
+    async def timeout(
+        self,
+        inter: disnake.ApplicationCommandInteraction,
+        user: disnake.Member = commands.Param(description="Member to timeout."),
+        minutes: int = commands.Param(
+            ge=1,
+            le=10080,  # up to 7 days
+            description="Duration in minutes (1–10080).",
+        ),
+        reason: str = commands.Param(
+            default="No reason provided.",
+            description="Reason for the timeout.",
+        ),
+    ):
+        if user == inter.author:
+            return await inter.response.send_message(
+                "Timing yourself out is just called going to bed.",
+                ephemeral=True,
+            )
+        if user == inter.guild.me:
+            return await inter.response.send_message(
+                "I’m not timing myself out.",
+                ephemeral=True,
+            )
 
-            # Use edit(timeout=...) which is stable across disnake versions
-            try:
-                await user.edit(
-                    timeout=datetime.now(timezone.utc) + duration,
-                    reason=f"{inter.author} | {reason}",
-                )
-            except Exception as e:
-                return await inter.response.send_message(
-                    f"Failed to timeout user: `{e}`",
-                    ephemeral=True,
-                )
+        duration = timedelta(minutes=minutes)
 
-            await inter.response.send_message(
-                f"⏰ Timed out **{user}** for **{minutes}** minute(s).",
+        # Use edit(timeout=...) which is stable across disnake versions
+        try:
+            await user.edit(
+                timeout=datetime.now(timezone.utc) + duration,
+                reason=f"{inter.author} | {reason}",
+            )
+        except Exception as e:
+            return await inter.response.send_message(
+                f"Failed to timeout user: `{e}`",
                 ephemeral=True,
             )
 
-            # Log to modlog
-            embed = disnake.Embed(
-                title="Member Timed Out",
-                color=disnake.Color.dark_gold(),
-                timestamp=datetime.now(timezone.utc),
-            )
-            embed.add_field("User", f"{user} ({user.id})", inline=True)
-            embed.add_field("Moderator", f"{inter.author} ({inter.author.id})", inline=True)
-            embed.add_field("Duration (min)", str(minutes), inline=True)
-            embed.add_field("Reason", reason, inline=False)
-            await self._send_modlog(inter.guild, embed)
+        await inter.response.send_message(
+            f"⏰ Timed out **{user}** for **{minutes}** minute(s).",
+            ephemeral=True,
+        )
+
+        # Log to modlog
+        embed = disnake.Embed(
+            title="Member Timed Out",
+            color=disnake.Color.dark_gold(),
+            timestamp=datetime.now(timezone.utc),
+        )
+        embed.add_field("User", f"{user} ({user.id})", inline=True)
+        embed.add_field("Moderator", f"{inter.author} ({inter.author.id})", inline=True)
+        embed.add_field("Duration (min)", str(minutes), inline=True)
+        embed.add_field("Reason", reason, inline=False)
+        await self._send_modlog(inter.guild, embed)
 
     @commands.slash_command(
         name="untimeout",
@@ -515,6 +856,216 @@ class Moderation(commands.Cog):
         embed.add_field("Reason", reason, inline=False)
         await self._send_modlog(inter.guild, embed)
 
+    # ------------- Bulk moderation ------------- #
+
+    def _mass_targets(
+        self, inter: disnake.ApplicationCommandInteraction, users: str, joined_within: int
+    ) -> tuple[list[int], str | None]:
+        """(target IDs, error message for the moderator or None)."""
+        if joined_within and not self.bot.intents.members:
+            # Without the members intent the member cache is nearly empty,
+            # so the join window would silently match nobody.
+            return [], (
+                "❌ `joined_within` needs the Server Members intent, which this bot runs without. "
+                "Pass the users as IDs/mentions instead."
+            )
+        ids = _parse_ids(users)
+        if joined_within:
+            cutoff = datetime.now(timezone.utc) - timedelta(minutes=joined_within)
+            ids += [m.id for m in inter.guild.members if m.joined_at and m.joined_at >= cutoff and not m.bot]
+        protected = {inter.author.id, inter.guild.me.id, inter.guild.owner_id}
+        targets = [i for i in dict.fromkeys(ids) if i not in protected][:MASS_MAX_TARGETS]
+        return targets, None if targets else "No valid targets given."
+
+    async def _run_mass_action(
+        self,
+        inter: disnake.ApplicationCommandInteraction,
+        verb: str,
+        targets: list[int],
+        action,
+    ) -> tuple[int, list[str], int]:
+        """
+        Run `action(user_id)` for every target with bounded concurrency.
+
+        disnake's HTTP client already waits out per-route rate-limit buckets;
+        the semaphore keeps us from flooding them. A single ephemeral message
+        is edited with progress at most every MASS_PROGRESS_INTERVAL seconds
+        and has a Cancel button. Returns (succeeded, failures, skipped).
+        """
+        view = MassActionView(inter.author.id)
+        sem = asyncio.Semaphore(MASS_CONCURRENCY)
+        done = ok = 0
+        failures: list[str] = []
+        last_update = time.monotonic()
+        live = True  # False once the interaction token stops accepting edits
+
+        async def progress(final: bool = False):
+            nonlocal live
+            if not live:
+                return
+            text = f"{verb}: **{done}/{len(targets)}** processed • ✅ {ok} • ❌ {len(failures)}"
+            if view.cancelled.is_set():
+                text += "\n🛑 Cancelled."
+            live = await _try_edit(inter, content=text, view=None if final else view)
+
+        async def run_one(user_id: int):
+            nonlocal done, ok, last_update
+            async with sem:
+                if view.cancelled.is_set():
+                    return
+                try:
+                    await action(user_id)
+                    ok += 1
+                except Exception as e:
+                    failures.append(f"`{user_id}`: {e}")
+                done += 1
+                if time.monotonic() - last_update >= MASS_PROGRESS_INTERVAL:
+                    last_update = time.monotonic()
+                    await progress()
+
+        await _try_edit(inter, content=f"{verb}: starting on **{len(targets)}** member(s)...", view=view)
+        await asyncio.gather(*(run_one(t) for t in targets))
+        view.stop()
+        await progress(final=True)
+        return ok, failures, len(targets) - done
+
+    async def _finish_mass_action(
+        self,
+        inter: disnake.ApplicationCommandInteraction,
+        title: str,
+        reason: str,
+        result: tuple[int, list[str], int],
+    ) -> None:
+        ok, failures, skipped = result
+        if failures:
+            details = "\n".join(failures[:15]) + (f"\n…and {len(failures) - 15} more" if len(failures) > 15 else "")
+            try:
+                await inter.followup.send(f"**Failures ({len(failures)}):**\n{details}"[:2000], ephemeral=True)
+            except disnake.HTTPException as e:
+                print(f"[moderation] Couldn't send {title} failure summary: {e}")
+
+        embed = disnake.Embed(
+            title=title,
+            color=disnake.Color.dark_red(),
+            timestamp=datetime.now(timezone.utc),
+        )
+        embed.add_field("Moderator", f"{inter.author} ({inter.author.id})", inline=True)
+        embed.add_field("Succeeded", str(ok), inline=True)
+        embed.add_field("Failed", str(len(failures)), inline=True)
+        if skipped:
+            embed.add_field("Cancelled before", str(skipped), inline=True)
+        embed.add_field("Reason", reason, inline=False)
+        await self._send_modlog(inter.guild, embed)
+
+    async def _member(self, guild: disnake.Guild, user_id: int) -> disnake.Member:
+        return guild.get_member(user_id) or await guild.fetch_member(user_id)
+
+    @commands.slash_command(
+        name="massban",
+        description="Ban many users at once (IDs/mentions and/or recent joins).",
+        dm_permission=False,
+        default_member_permissions=disnake.Permissions(ban_members=True),
+    )
+    async def massban(
+        self,
+        inter: disnake.ApplicationCommandInteraction,
+        users: str = commands.Param(default="", description="User IDs or mentions, separated by spaces."),
+        joined_within: int = commands.Param(
+            default=0,
+            ge=0,
+            le=10080,
+            description="Also include members who joined in the last X minutes.",
+        ),
+        reason: str = commands.Param(default="No reason provided.", description="Reason for banning."),
+        delete_days: int = commands.Param(
+            default=0,
+            ge=0,
+            le=7,
+            description="Delete message history from the last X days (0–7).",
+        ),
+    ):
+        await inter.response.defer(ephemeral=True)
+        targets, error = self._mass_targets(inter, users, joined_within)
+        if error:
+            return await inter.edit_original_message(error)
+
+        async def ban(user_id: int):
+            await inter.guild.ban(
+                disnake.Object(user_id),
+                reason=f"{inter.author} | {reason}",
+                delete_message_days=delete_days,
+            )
+
+        result = await self._run_mass_action(inter, "🔨 Mass ban", targets, ban)
+        await self._finish_mass_action(inter, "Mass Ban", reason, result)
+
+    @commands.slash_command(
+        name="masskick",
+        description="Kick many members at once (IDs/mentions and/or recent joins).",
+        dm_permission=False,
+        default_member_permissions=disnake.Permissions(kick_members=True),
+    )
+    async def masskick(
+        self,
+        inter: disnake.ApplicationCommandInteraction,
+        users: str = commands.Param(default="", description="User IDs or mentions, separated by spaces."),
+        joined_within: int = commands.Param(
+            default=0,
+            ge=0,
+            le=10080,
+            description="Also include members who joined in the last X minutes.",
+        ),
+        reason: str = commands.Param(default="No reason provided.", description="Reason for kicking."),
+    ):
+        await inter.response.defer(ephemeral=True)
+        targets, error = self._mass_targets(inter, users, joined_within)
+        if error:
+            return await inter.edit_original_message(error)
+
+        async def kick(user_id: int):
+            member = await self._member(inter.guild, user_id)
+            await member.kick(reason=f"{inter.author} | {reason}")
+
+        result = await self._run_mass_action(inter, "👢 Mass kick", targets, kick)
+        await self._finish_mass_action(inter, "Mass Kick", reason, result)
+
+    @commands.slash_command(
+        name="masstimeout",
+        description="Timeout many members at once (IDs/mentions and/or recent joins).",
+        dm_permission=False,
+        default_member_permissions=disnake.Permissions(moderate_members=True),
+    )
+    async def masstimeout(
+        self,
+        inter: disnake.ApplicationCommandInteraction,
+        minutes: int = commands.Param(
+            ge=1,
+            le=10080,  # up to 7 days
+            description="Duration in minutes (1–10080).",
+        ),
+        users: str = commands.Param(default="", description="User IDs or mentions, separated by spaces."),
+        joined_within: int = commands.Param(
+            default=0,
+            ge=0,
+            le=10080,
+            description="Also include members who joined in the last X minutes.",
+        ),
+        reason: str = commands.Param(default="No reason provided.", description="Reason for the timeout."),
+    ):
+        await inter.response.defer(ephemeral=True)
+        targets, error = self._mass_targets(inter, users, joined_within)
+        if error:
+            return await inter.edit_original_message(error)
+
+        until = datetime.now(timezone.utc) + timedelta(minutes=minutes)
+
+        async def timeout(user_id: int):
+            member = await self._member(inter.guild, user_id)
+            await member.edit(timeout=until, reason=f"{inter.author} | {reason}")
+
+        result = await self._run_mass_action(inter, "⏰ Mass timeout", targets, timeout)
+        await self._finish_mass_action(inter, "Mass Timeout", reason, result)
+
     # ------------- Modlog configuration ------------- #
 
     @commands.slash_command(
@@ -536,9 +1087,8 @@ class Moderation(commands.Cog):
         inter: disnake.ApplicationCommandInteraction,
         channel: disnake.TextChannel = commands.Param(description="Channel to use for moderation logs."),
     ):
-        data = _load_modlog()
-        data[str(inter.guild.id)] = channel.id
-        _save_modlog(data)
+        self.modlog_config.set(inter.guild.id, channel.id)
+        self._modlog_channels[inter.guild.id] = channel
 
         await inter.response.send_message(
             f"📝 Modlog channel set to {channel.mention}.",
@@ -550,9 +1100,8 @@ class Moderation(commands.Cog):
         description="Disable moderation logging for this server.",
     )
     async def modlog_disable(self, inter: disnake.ApplicationCommandInteraction):
-        data = _load_modlog()
-        removed = data.pop(str(inter.guild.id), None)
-        _save_modlog(data)
+        removed = self.modlog_config.remove(inter.guild.id)
+        self._modlog_channels.pop(inter.guild.id, None)
 
         if removed:
             msg = "🛑 Modlog disabled for this server."
@@ -566,8 +1115,7 @@ class Moderation(commands.Cog):
         description="Show the current modlog channel.",
     )
     async def modlog_show(self, inter: disnake.ApplicationCommandInteraction):
-        data = _load_modlog()
-        ch_id = data.get(str(inter.guild.id))
+        ch_id = self.modlog_config.get(inter.guild.id)
 
         if not ch_id:
             return await inter.response.send_message(
@@ -1,9 +1,62 @@
-import asyncio, time, platform
+import asyncio, json, time, platform
+from pathlib import Path
+from urllib.parse import quote
 import disnake
-from disnake.ext import commands
+from disnake.ext import commands, tasks
+from utils.cache import TTLCache
+from utils import metrics
+from utils.http import _get_json
+from utils.persist import atomic_write_json
+from utils.polls import PollStore, parse_custom_id, poll_custom_id
+from utils.reminders import Reminders
+from utils.scheduler import Scheduler
 
 BOOT_TIME = time.time()
 
+DICT_API = "https://api.dictionaryapi.dev/api/v2/entries/en/{word}"
+DICT_HEADERS = {"User-Agent": "SerpentCore/define (Discord Bot)"}
+DEFINE_CACHE_FILE = Path("data") / "define_cache.json"
+# Definitions barely change, so hits live for a month; "not found" only briefly.
+_definitions = TTLCache(maxsize=1000, ttl=30 * 86400)
+_not_found = TTLCache(maxsize=500, ttl=600)
+metrics.register_cache("define", _definitions.stats)
+
+def _load_define_cache() -> None:
+    try:
+        with DEFINE_CACHE_FILE.open("r", encoding="utf-8") as f:
+            _definitions.restore(json.load(f))
+    except (OSError, ValueError, TypeError) as e:
+        if DEFINE_CACHE_FILE.exists(): print(f"[define] Ignoring unreadable cache: {e}")
+
+def _save_define_cache(entries: list) -> None:
+    atomic_write_json(DEFINE_CACHE_FILE, entries)
+
+def _parse_entry(data) -> dict | None:
+    """Reduce a dictionaryapi.dev response to {"defs": [...], "phonetic": str}."""
+    if not data or not isinstance(data, list): return None
+    entry = data[0]; defs = []
+    for m in entry.get("meanings", []):
+        part = m.get("partOfSpeech","")
+        for d in m.get("definitions",[])[:1]:
+            txt = d.get("definition","")
+            if txt: defs.append(f"*{part}*: {txt}")
+        if len(defs) >= 3: break
+    return {"defs": defs, "phonetic": entry.get("phonetic") or ""}
+
+async def lookup_definition(word: str) -> tuple[dict | None, bool]:
+    """Return (parsed entry or None, not_found). Never blocks the event loop."""
+    key = word.strip().lower()
+    cached = _definitions.get(key)
+    if cached is not None: return cached, False
+    if key in _not_found: return None, True
+    # 404 carries a JSON {"title": "No Definitions Found", ...} body.
+    data = await _get_json(DICT_API.format(word=quote(key, safe="")), headers=DICT_HEADERS, timeout=8, ok_statuses=(200, 404))
+    if isinstance(data, dict):
+        _not_found.set(key, True); return None, True
+    parsed = _parse_entry(data)
+    if parsed is not None: _definitions.set(key, parsed)
+    return parsed, False
+
 def _fmt(seconds: float) -> str:
     s = int(seconds); m, s = divmod(s, 60); h, m = divmod(m, 60); d, h = divmod(h, 24)
     return " ".join([f"{d}d" if d else "", f"{h}h" if h else "", f"{m}m" if m else "", f"{s}s" if s or not (d or h or m) else "" ]).strip()
@@ -11,9 +64,79 @@ def _fmt(seconds: float) -> str:
 def _ts_rel(delta_sec: int) -> str:
     return f"<t:{int(time.time() + delta_sec)}:R>"
 
+POLL_EDIT_INTERVAL = 3.0
+
+def _poll_embed(poll: dict, tallies: list[int], final: bool = False) -> disnake.Embed:
+    total = sum(tallies)
+    lines = []
+    for label, n in zip(poll["options"], tallies):
+        bar = "█" * round(10 * n / total) if total else ""
+        lines.append(f"**{label}** — {n} {bar}")
+    embed = disnake.Embed(title="📊 Poll", description=poll["question"], color=disnake.Color.blurple())
+    embed.add_field(name="Results" if final else "Live tally", value="\n".join(lines) if total else "No votes.", inline=False)
+    embed.add_field(name="Closed" if final else "Closes", value=f"<t:{int(poll['closes'])}:R>", inline=False)
+    return embed
+
+def _poll_buttons(poll: dict, disabled: bool = False) -> list[disnake.ui.Button]:
+    return [
+        disnake.ui.Button(style=disnake.ButtonStyle.primary, label=label[:80], custom_id=poll_custom_id(poll["id"], i), disabled=disabled)
+        for i, label in enumerate(poll["options"])
+    ]
+
 class Util(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        _load_define_cache()
+        self._saved_define_misses = 0
+        self.save_define_cache.start()
+        self.reminders = Reminders(self._deliver_reminder)
+        self.bot.loop.create_task(self._start_reminders())
+        # Polls are routed by custom_id ("poll:<id>:<option>"), so buttons keep
+        # working across restarts without any View objects.
+        self.polls = PollStore()
+        self._poll_edits: dict[str, asyncio.Task] = {}
+        self.poll_scheduler = Scheduler(self._close_poll)
+        for p in self.polls.polls.values():
+            self.poll_scheduler.add(p["id"], p["closes"])
+        self.bot.loop.create_task(self._start_polls())
+
+    def cog_unload(self):
+        self.save_define_cache.cancel()
+        _save_define_cache(_definitions.snapshot())
+        self.reminders.close()
+        self.poll_scheduler.stop()
+        for task in self._poll_edits.values(): task.cancel()
+        self.polls.writer.flush_sync()
+
+    async def _start_reminders(self):
+        # Wait for the cache so overdue reminders can resolve users/channels.
+        await self.bot.wait_until_ready()
+        self.reminders.start()
+
+    async def _deliver_reminder(self, r: dict):
+        late = time.time() - r["due"] > 60
+        content = f"⏰ **Reminder:** {r['message']}\nRequested <t:{int(r['created'])}:R>." + (" (Sorry, I was offline when this was due.)" if late else "")
+        if r["dm"]:
+            try:
+                user = self.bot.get_user(r["user_id"]) or await self.bot.fetch_user(r["user_id"])
+                await user.send(content); return
+            except (disnake.Forbidden, disnake.NotFound):
+                pass
+        channel = self.bot.get_channel(r["channel_id"]) if r["channel_id"] else None
+        if channel is None:
+            return print(f"[remindme] Couldn't deliver reminder {r['id']}: no DM and no channel.")
+        try:
+            await channel.send(f"<@{r['user_id']}> {content}", allowed_mentions=disnake.AllowedMentions(users=[disnake.Object(r["user_id"])], everyone=False, roles=False))
+        except (disnake.Forbidden, disnake.NotFound) as e:
+            # Won't get better by retrying; anything else propagates so Reminders retries it.
+            print(f"[remindme] Couldn't deliver reminder {r['id']} to channel {r['channel_id']}: {e}")
+
+    @tasks.loop(minutes=10)
+    async def save_define_cache(self):
+        # New entries only ever follow a miss.
+        if _definitions.misses == self._saved_define_misses: return
+        self._saved_define_misses = _definitions.misses
+        await asyncio.to_thread(_save_define_cache, _definitions.snapshot())
 
     @commands.slash_command(name="util", description="Utility & QoL commands")
     async def util_group(self, inter: disnake.ApplicationCommandInteraction):
@@ -39,16 +162,17 @@ class Util(commands.Cog):
         if not inter.guild:
             return await inter.response.send_message("Use this in a server.", ephemeral=True)
         g = inter.guild
-        humans = sum(1 for m in g.members if not m.bot) if g.members else 0
-        bots = sum(1 for m in g.members if m.bot) if g.members else 0
+        stats = self.bot.guild_stats.get(g)
+        if stats.humans is None: members = f"Total: {g.member_count or 'Unknown'}"
+        else: members = f"Humans: {stats.humans}\nBots: {stats.bots}"
         embed = disnake.Embed(title=f"{g.name} • Server Info", color=disnake.Color.blurple())
         if g.icon: embed.set_thumbnail(url=g.icon.url)
         embed.add_field(name="ID", value=str(g.id))
         embed.add_field(name="Owner", value=str(g.owner) if g.owner else "Unknown")
         embed.add_field(name="Created", value=disnake.utils.format_dt(g.created_at, style="R"))
-        embed.add_field(name="Members", value=f"Humans: {humans}\nBots: {bots}")
-        embed.add_field(name="Channels", value=f"Text: {len(g.text_channels)} • Voice: {len(g.voice_channels)}")
-        embed.add_field(name="Roles", value=str(len(g.roles)))
+        embed.add_field(name="Members", value=members)
+        embed.add_field(name="Channels", value=f"Text: {stats.text_channels} • Voice: {stats.voice_channels}")
+        embed.add_field(name="Roles", value=str(stats.roles))
         await inter.response.send_message(embed=embed)
 
     @util_group.sub_command(description="Set a reminder.")
@@ -59,20 +183,8 @@ class Util(commands.Cog):
         message: str = commands.Param(default="Reminder!", description="What to remind you about"),
         dm: bool = commands.Param(default=True, description="Send via DM if possible"),
     ):
+        self.reminders.add(user_id=inter.author.id, channel_id=inter.channel_id, message=message, dm=dm, delay=minutes * 60)
         await inter.response.send_message(f"⏰ Reminding you {_ts_rel(minutes*60)}.", ephemeral=True)
-        async def _task():
-            try:
-                await asyncio.sleep(minutes * 60)
-                content = f"⏰ **Reminder:** {message}\nRequested {_ts_rel(-minutes*60)}."
-                if dm:
-                    try:
-                        await inter.author.send(content); return
-                    except disnake.Forbidden:
-                        pass
-                await inter.followup.send(content, allowed_mentions=disnake.AllowedMentions.none())
-            except Exception:
-                pass
-        inter.bot.loop.create_task(_task())
 
     @util_group.sub_command(description="Create a quick poll with up to 5 options.")
     async def poll(
@@ -86,59 +198,63 @@ class Util(commands.Cog):
         option5: str = "",
         duration_seconds: int = commands.Param(default=60, ge=15, le=3600),
     ):
-        from collections import Counter
-        class View(disnake.ui.View):
-            def __init__(self, opts, duration):
-                super().__init__(timeout=duration)
-                self.tallies = Counter()
-                self.voted: dict[int,int] = {}
-                for i, lab in enumerate(opts[:5]):
-                    self.add_item(Btn(str(i), lab))
-                self.message = None
-            async def on_timeout(self):
-                for c in self.children:
-                    if isinstance(c, disnake.ui.Button): c.disabled = True
-                if self.message:
-                    total = sum(self.tallies.values())
-                    if not total:
-                        res = "No votes."
-                    else:
-                        lines = []
-                        for c in self.children:
-                            if isinstance(c, disnake.ui.Button):
-                                lines.append(f"**{c.label}** — {self.tallies.get(c.custom_id,0)}")
-                        res = "\n".join(lines)
-                    emb = self.message.embeds[0].copy() if self.message.embeds else disnake.Embed()
-                    emb.add_field(name="Results", value=res, inline=False)
-                    await self.message.edit(embed=emb, view=self)
-        class Btn(disnake.ui.Button):
-            def __init__(self, cid, label):
-                super().__init__(style=disnake.ButtonStyle.primary, label=label[:80], custom_id=cid)
-            async def callback(self, i: disnake.MessageInteraction):
-                v: View = self.view
-                uid = i.author.id
-                idx = int(self.custom_id)
-                prev = v.voted.get(uid)
-                if prev is not None and prev != idx:
-                    v.tallies[str(prev)] -= 1
-                if prev == idx:
-                    v.voted.pop(uid, None); v.tallies[str(idx)] -= 1
-                    msg = f"Removed your vote for **{self.label}**."
-                else:
-                    v.voted[uid] = idx; v.tallies[str(idx)] += 1
-                    msg = f"You voted for **{self.label}**."
-                try: await i.response.send_message(msg, ephemeral=True)
-                except disnake.InteractionResponded: await i.followup.send(msg, ephemeral=True)
-
         options = [o for o in [option1, option2, option3, option4, option5] if o]
         if len(options) < 2:
             return await inter.response.send_message("Need at least 2 options.", ephemeral=True)
 
-        view = View(options, duration_seconds)
-        embed = disnake.Embed(title="📊 Poll", description=question, color=disnake.Color.blurple())
-        embed.set_footer(text=f"Closes {_ts_rel(duration_seconds)}")
-        await inter.response.send_message(embed=embed, view=view)
-        view.message = await inter.original_message()
+        poll = self.polls.create(channel_id=inter.channel_id, question=question, options=options, duration=duration_seconds)
+        self.poll_scheduler.add(poll["id"], poll["closes"])
+        await inter.response.send_message(embed=_poll_embed(poll, self.polls.tallies[poll["id"]]), components=_poll_buttons(poll))
+        self.polls.set_message(poll["id"], (await inter.original_message()).id)
+
+    @commands.Cog.listener("on_button_click")
+    async def on_poll_vote(self, i: disnake.MessageInteraction):
+        parsed = parse_custom_id(i.data.custom_id or "")
+        if parsed is None: return
+        poll_id, idx = parsed
+        cast = self.polls.vote(poll_id, i.author.id, idx)
+        if cast is None:
+            return await i.response.send_message("This poll is closed.", ephemeral=True)
+        label = self.polls.polls[poll_id]["options"][idx]
+        msg = f"You voted for **{label}**." if cast else f"Removed your vote for **{label}**."
+        await i.response.send_message(msg, ephemeral=True)
+        self._queue_poll_edit(poll_id)
+
+    def _queue_poll_edit(self, poll_id: str):
+        """Refresh the poll message at most once per POLL_EDIT_INTERVAL, however many votes arrive."""
+        if poll_id in self._poll_edits: return
+        self._poll_edits[poll_id] = self.bot.loop.create_task(self._edit_poll_later(poll_id))
+
+    async def _edit_poll_later(self, poll_id: str):
+        try:
+            await asyncio.sleep(POLL_EDIT_INTERVAL)
+        finally:
+            self._poll_edits.pop(poll_id, None)
+        poll = self.polls.polls.get(poll_id)
+        if poll is None or poll["message_id"] is None: return
+        try:
+            await self._poll_message(poll).edit(embed=_poll_embed(poll, self.polls.tallies[poll_id]))
+        except disnake.HTTPException as e:
+            print(f"[poll] Couldn't update poll {poll_id}: {e}")
+
+    def _poll_message(self, poll: dict) -> disnake.PartialMessage:
+        return self.bot.get_partial_messageable(poll["channel_id"]).get_partial_message(poll["message_id"])
+
+    async def _close_poll(self, poll_id: str):
+        task = self._poll_edits.pop(poll_id, None)
+        if task: task.cancel()
+        closed = self.polls.close(poll_id)
+        if closed is None: return
+        poll, tallies = closed
+        if poll["message_id"] is None: return
+        try:
+            await self._poll_message(poll).edit(embed=_poll_embed(poll, tallies, final=True), components=_poll_buttons(poll, disabled=True))
+        except disnake.HTTPException as e:
+            print(f"[poll] Couldn't close poll {poll_id}: {e}")
+
+    async def _start_polls(self):
+        await self.bot.wait_until_ready()
+        self.poll_scheduler.start()
 
     @util_group.sub_command(description="Show bot stats.")
     async def stats(self, inter: disnake.ApplicationCommandInteraction):
@@ -154,31 +270,13 @@ class Util(commands.Cog):
     @util_group.sub_command(description="Define an English word.")
     async def define(self, inter: disnake.ApplicationCommandInteraction, word: str):
         await inter.response.send_message(f"Looking up **{word}**...", ephemeral=True)
-        import json, urllib.request, urllib.error
-        def _get(url: str):
-            req = urllib.request.Request(url, headers={"User-Agent":"SerpentCore/define (Discord Bot)"})
-            try:
-                with urllib.request.urlopen(req, timeout=8) as r:
-                    if r.status != 200: return None
-                    return json.loads(r.read().decode("utf-8", "replace"))
-            except Exception:
-                return None
-        data = _get(f"https://api.dictionaryapi.dev/api/v2/entries/en/{word}")
-        if not data or not isinstance(data, list):
-            return await inter.followup.send(f"Couldn’t fetch a definition for **{word}**.")
-        entry = data[0]; meanings = entry.get("meanings", [])
-        if not meanings:
+        entry, not_found = await lookup_definition(word)
+        if not_found or (entry is not None and not entry["defs"]):
             return await inter.followup.send(f"No definitions found for **{word}**.")
-        defs = []
-        for m in meanings:
-            part = m.get("partOfSpeech","")
-            for d in m.get("definitions",[])[:1]:
-                txt = d.get("definition","")
-                if txt: defs.append(f"*{part}*: {txt}")
-            if len(defs) >= 3: break
-        emb = disnake.Embed(title=f"📚 {word}", description="\n".join(defs)[:4000] or "No definition text.", color=disnake.Color.blurple())
-        phon = entry.get("phonetic") or ""
-        if phon: emb.set_footer(text=phon)
+        if entry is None:
+            return await inter.followup.send(f"Couldn’t fetch a definition for **{word}**.")
+        emb = disnake.Embed(title=f"📚 {word}", description="\n".join(entry["defs"])[:4000] or "No definition text.", color=disnake.Color.blurple())
+        if entry["phonetic"]: emb.set_footer(text=entry["phonetic"])
         await inter.followup.send(embed=emb)
 
 def setup(bot):
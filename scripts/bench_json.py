@@ -0,0 +1,106 @@
+"""
+Micro-benchmark for the JSON decode path in utils.http.
+
+Usage:
+    python -m scripts.bench_json [listing.json ...]
+    python -m scripts.bench_json --record <subreddit>
+    python -m scripts.bench_json --synthetic
+
+With no arguments the committed fixture (scripts/fixtures/reddit_hot_cats.json)
+is used: a 50-post hot listing with the full set of post fields and the usual
+mix of image, gallery, video, link and self posts. `--record` replaces it with
+the live https://old.reddit.com/r/<subreddit>/hot.json?limit=50, with author
+names and IDs scrubbed. The synthetic listing is only a fallback for when the
+fixture is missing.
+"""
+from __future__ import annotations
+
+import json
+import sys
+import timeit
+import urllib.request
+from pathlib import Path
+
+from utils.http import decode_json, orjson
+from utils.reddit import BASE_URL, UA_LINUX, project_listing
+
+NUMBER = 200
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "reddit_hot_cats.json"
+
+
+def _synthetic_listing(posts: int = 50) -> bytes:
+    children = []
+    for i in range(posts):
+        children.append({
+            "kind": "t3",
+            "data": {
+                "id": f"abc{i}",
+                "title": "A very good cat " * 4,
+                "selftext": "lorem ipsum " * 40,
+                "url": f"https://i.redd.it/{i}.jpg",
+                "url_overridden_by_dest": f"https://i.redd.it/{i}.jpg",
+                "over_18": False,
+                "preview": {"images": [{"resolutions": [{"url": "x", "width": w, "height": w} for w in range(8)]}]},
+                "all_awardings": [{"name": "award", "count": 1}] * 5,
+                "score": i * 10,
+            },
+        })
+    return json.dumps({"kind": "Listing", "data": {"children": children}}).encode()
+
+
+def _scrub(listing: dict) -> dict:
+    """Replace author names/IDs so the fixture doesn't carry user data."""
+    listing["data"]["modhash"] = ""
+    for i, child in enumerate(listing["data"]["children"]):
+        data = child["data"]
+        if data.get("author") != "AutoModerator":
+            data["author"] = f"user_{i:02d}"
+            data["author_fullname"] = f"t2_{i:08d}"
+        data["author_flair_text"] = None
+        data["author_flair_richtext"] = []
+    return listing
+
+
+def record(subreddit: str, path: Path = FIXTURE) -> None:
+    url = f"{BASE_URL}/r/{subreddit}/hot.json?limit=50"
+    req = urllib.request.Request(url, headers={"User-Agent": UA_LINUX})
+    with urllib.request.urlopen(req, timeout=15) as resp:
+        listing = json.loads(resp.read())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(_scrub(listing)), encoding="utf-8")
+    print(f"Recorded {len(listing['data']['children'])} posts from {url} to {path}.")
+
+
+def _bench(label: str, fn) -> None:
+    secs = timeit.timeit(fn, number=NUMBER) / NUMBER
+    print(f"  {label:<34} {secs * 1e3:8.3f} ms")
+
+
+def _default_payloads() -> list[tuple[str, bytes]]:
+    if FIXTURE.exists():
+        return [(FIXTURE.name, FIXTURE.read_bytes())]
+    print(f"{FIXTURE} not found, using a synthetic listing.")
+    return [("synthetic", _synthetic_listing())]
+
+
+def main(args: list[str]) -> None:
+    if args[:1] == ["--record"] and len(args) == 2:
+        return record(args[1])
+    if args == ["--synthetic"]:
+        payloads = [("synthetic", _synthetic_listing())]
+    else:
+        payloads = [(p, Path(p).read_bytes()) for p in args] or _default_payloads()
+    print(f"orjson: {'available' if orjson is not None else 'not installed'}")
+
+    for name, raw in payloads:
+        print(f"{name} ({len(raw) / 1024:.1f} KiB)")
+        # Old path: resp.text() then json.loads, i.e. a str decode plus a parse.
+        _bench("text + json.loads", lambda: json.loads(raw.decode("utf-8")))
+        _bench("json.loads(bytes)", lambda: json.loads(raw))
+        if orjson is not None:
+            _bench("orjson.loads(bytes)", lambda: orjson.loads(raw))
+        _bench("decode_json + project_listing", lambda: project_listing(decode_json(raw)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
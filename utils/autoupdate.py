@@ -1,49 +1,62 @@
 from __future__ import annotations
 
-import subprocess
+import asyncio
 from pathlib import Path
 
 REPO_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_TIMEOUT = 60.0
 
 
-def auto_update() -> None:
-    """Attempt to git pull on startup.
-    
+async def _git(*args: str, timeout: float) -> tuple[int, str, str]:
+    """Run a git command in the repo; kills it and raises TimeoutError if it overruns."""
+    proc = await asyncio.create_subprocess_exec(
+        "git", *args,
+        cwd=REPO_DIR,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return proc.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+
+async def auto_update(timeout: float = DEFAULT_TIMEOUT) -> None:
+    """Attempt to git pull in the background.
+
     - Skips if there are local changes.
+    - Each git call is killed after `timeout` seconds.
+    - Pulled changes take effect on the next restart.
     - Does not raise if git/network fails; just logs and continues.
     """
     try:
-        status = subprocess.run(
-            ["git", "status", "--porcelain"],
-            cwd=REPO_DIR,
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-
-        if status.stdout.strip():
+        # Untracked files (data/, .env) don't block a fast-forward pull.
+        _, status, _ = await _git("status", "--porcelain", "--untracked-files=no", timeout=timeout)
+
+        if status.strip():
             print("[autoupdate] Local changes detected, skipping git pull.")
             return
-        
+
         print("[autoupdate] Pulling latest changes from origin...")
-        result = subprocess.run(
-            ["git", "pull", "--ff-only"],
-            cwd=REPO_DIR,
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-
-        if result.returncode == 0:
+        returncode, stdout, stderr = await _git("pull", "--ff-only", timeout=timeout)
+
+        if returncode == 0:
             print("[autoupdate] git pull completed.")
-            if result.stdout.strip():
-                print(result.stdout.strip())
+            if stdout.strip():
+                print(stdout.strip())
+            if "Already up to date" not in stdout:
+                print("[autoupdate] Restart the bot to run the new version.")
         else:
             print("[autoupdate] git pull failed:")
-            if result.stdout.strip():
-                print("STDOUT:", result.stdout.strip())
-            if result.stderr.strip():
-                print("STDERR:", result.stderr.strip())
-    
+            if stdout.strip():
+                print("STDOUT:", stdout.strip())
+            if stderr.strip():
+                print("STDERR:", stderr.strip())
+
+    except asyncio.TimeoutError:
+        print(f"[autoupdate] git did not finish within {timeout:.0f}s, giving up.")
     except Exception as e:
-        print(f"[autoupdate] Error while updating: {e}")
\ No newline at end of file
+        print(f"[autoupdate] Error while updating: {e}")
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Classic three-state circuit breaker.
+
+    - closed: requests flow; `failure_threshold` consecutive failures open it.
+    - open: requests fail fast until `reset_timeout` seconds have passed.
+    - half_open: a single probe request is let through; success closes the
+      breaker, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = HALF_OPEN
+        # half-open: one probe at a time
+        if self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def release(self) -> None:
+        """Give back a probe slot from allow() without recording an outcome."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._probing = False
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """
+    Rolling window of request latencies used to derive a timeout.
+
+    Requests that time out should be added at the timeout they hit; otherwise
+    the window only ever sees fast responses and the timeout can only shrink.
+    """
+
+    def __init__(
+        self,
+        window: int = 50,
+        *,
+        min_samples: int = 10,
+        percentile: float = 0.95,
+        multiplier: float = 2.0,
+        floor: float = 2.0,
+    ):
+        self.samples: deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.floor = floor
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def quantile(self, q: float) -> float | None:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        idx = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[idx]
+
+    def timeout(self, cap: float) -> float:
+        """Suggested timeout: a multiple of the observed percentile, within [floor, cap]."""
+        if len(self.samples) < self.min_samples:
+            return cap
+        observed = self.quantile(self.percentile) * self.multiplier
+        return max(self.floor, min(cap, observed))
+
+
+class HostHealth:
+    """Breaker + latency stats for a single upstream host."""
+
+    def __init__(self):
+        self.breaker = CircuitBreaker()
+        self.latency = LatencyTracker()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.breaker.state,
+            "failures": self.breaker.failures,
+            "p50": self.latency.quantile(0.5),
+            "p95": self.latency.quantile(0.95),
+            "samples": len(self.latency.samples),
+        }
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+class TTLCache:
+    """
+    Small in-memory LRU cache with a freshness window.
+
+    - Entries younger than `ttl` are fresh.
+    - Entries older than `ttl` but younger than `max_stale` are still served,
+      flagged as stale so the caller can refresh them in the background.
+    - At most `maxsize` entries; the least recently used one is evicted first.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 300, max_stale: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_stale = max_stale if max_stale is not None else ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.lookup(key, count=False)[1] != MISS
+
+    def lookup(self, key: Hashable, *, count: bool = True) -> tuple[Any, str]:
+        """Return (value, state) where state is FRESH, STALE or MISS."""
+        item = self._data.get(key)
+        if item is None:
+            if count:
+                self.misses += 1
+            return None, MISS
+
+        stored_at, value = item
+        age = time.monotonic() - stored_at
+        if age > self.max_stale:
+            del self._data[key]
+            if count:
+                self.misses += 1
+            return None, MISS
+
+        self._data.move_to_end(key)
+        if age > self.ttl:
+            if count:
+                self.stale_hits += 1
+            return value, STALE
+        if count:
+            self.hits += 1
+        return value, FRESH
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value, state = self.lookup(key)
+        return default if state == MISS else value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def snapshot(self) -> list[list]:
+        """[key, value, stored_at_wall_clock] for every entry, oldest first (JSON-friendly)."""
+        now_mono, now_wall = time.monotonic(), time.time()
+        return [[key, value, now_wall - (now_mono - stored_at)] for key, (stored_at, value) in self._data.items()]
+
+    def restore(self, entries: list[list]) -> None:
+        """Load entries produced by snapshot(), dropping ones that are too old."""
+        now_mono, now_wall = time.monotonic(), time.time()
+        for key, value, stored_wall in entries:
+            age = now_wall - stored_wall
+            if age > self.max_stale:
+                continue
+            self._data[key] = (now_mono - age, value)
+            self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+
+from .persist import atomic_write_json, load_json
+
+SYNC_STATE_FILE = Path("data") / "command_sync.json"
+
+
+def _digest(payload) -> str:
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def command_hashes(bot) -> dict[str, str]:
+    """
+    Stable hash of every registered application command, keyed by
+    "<type>:<name>" (e.g. "chat_input:fun", "user:Warn user").
+
+    The hash covers the command body Discord sees (options, localizations,
+    permissions) plus the guilds it's registered in.
+    """
+    hashes = {}
+    for cmd in bot.application_commands:
+        body = cmd.body.to_dict()
+        key = f"{cmd.body.type.name}:{cmd.body.name}"
+        hashes[key] = _digest({"body": body, "guild_ids": sorted(cmd.guild_ids or ())})
+    return hashes
+
+
+def tree_hash(hashes: dict[str, str]) -> str:
+    return _digest(sorted(hashes.items()))
+
+
+def diff(old: dict[str, str], new: dict[str, str]) -> tuple[list[str], list[str], list[str]]:
+    """(added, removed, changed) command keys."""
+    added = sorted(new.keys() - old.keys())
+    removed = sorted(old.keys() - new.keys())
+    changed = sorted(k for k in new.keys() & old.keys() if new[k] != old[k])
+    return added, removed, changed
+
+
+def load_state(path: Path = SYNC_STATE_FILE) -> dict:
+    return load_json(path)
+
+
+def save_state(application_id: int, hashes: dict[str, str], path: Path = SYNC_STATE_FILE) -> None:
+    atomic_write_json(
+        path,
+        {"application_id": application_id, "tree": tree_hash(hashes), "commands": hashes},
+        indent=2,
+    )
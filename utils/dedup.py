@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import hashlib
+from collections import Counter, OrderedDict, deque
+from typing import Hashable
+
+
+def _digest(value: str) -> int:
+    """64-bit hash of a string; stable across runs unlike hash()."""
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class RecentRing:
+    """Fixed-size ring of hashed values with O(1) membership checks."""
+
+    def __init__(self, size: int):
+        self._ring: deque[int] = deque(maxlen=size)
+        self._counts: Counter[int] = Counter()
+
+    def __contains__(self, value: str) -> bool:
+        return _digest(value) in self._counts
+
+    def add(self, value: str) -> None:
+        h = _digest(value)
+        if len(self._ring) == self._ring.maxlen:
+            old = self._ring[0]
+            self._counts[old] -= 1
+            if not self._counts[old]:
+                del self._counts[old]
+        self._ring.append(h)
+        self._counts[h] += 1
+
+
+class RecentlyShown:
+    """
+    Per-key (e.g. per-channel) RecentRing, with at most `max_keys` rings kept.
+
+    Each ring holds `per_key` hashes, so memory stays bounded no matter how
+    long the bot runs or how many channels use it.
+    """
+
+    def __init__(self, per_key: int = 30, max_keys: int = 500):
+        self.per_key = per_key
+        self.max_keys = max_keys
+        self._rings: OrderedDict[Hashable, RecentRing] = OrderedDict()
+
+    def _ring(self, key: Hashable) -> RecentRing:
+        ring = self._rings.get(key)
+        if ring is None:
+            ring = self._rings[key] = RecentRing(self.per_key)
+            if len(self._rings) > self.max_keys:
+                self._rings.popitem(last=False)
+        self._rings.move_to_end(key)
+        return ring
+
+    def filter(self, key: Hashable, values: list[str]) -> list[str]:
+        """Values not recently shown for `key`; all of them if every one was."""
+        ring = self._rings.get(key)
+        if ring is None:
+            return values
+        fresh = [v for v in values if v not in ring]
+        return fresh or values
+
+    def mark(self, key: Hashable, value: str) -> None:
+        self._ring(key).add(value)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import disnake
+
+
+@dataclass
+class GuildStats:
+    humans: int | None  # None when the members intent is off
+    bots: int | None
+    text_channels: int
+    voice_channels: int
+    roles: int
+
+
+class GuildStatsIndex:
+    """
+    Per-guild counters kept up to date from gateway events.
+
+    Each guild is counted once (at ready / guild join) and then adjusted on
+    member, channel and role events, so lookups never walk guild.members.
+
+    Human/bot counts need the privileged members intent: without it Discord
+    neither sends member events nor the member list, so those counts are
+    None and callers should fall back to guild.member_count (a total that
+    disnake keeps from GUILD_CREATE).
+    """
+
+    def __init__(self, bot: disnake.Client):
+        self.bot = bot
+        self.track_members = bot.intents.members
+        self._stats: dict[int, GuildStats] = {}
+
+        for event, handler in (
+            ("on_ready", self._on_ready),
+            ("on_guild_join", self.rebuild),
+            ("on_guild_available", self.rebuild),
+            ("on_guild_remove", self._on_guild_remove),
+            ("on_member_join", self._on_member_join),
+            ("on_raw_member_remove", self._on_raw_member_remove),
+            ("on_guild_channel_create", self._on_channel_create),
+            ("on_guild_channel_delete", self._on_channel_delete),
+            ("on_guild_role_create", self._on_role_create),
+            ("on_guild_role_delete", self._on_role_delete),
+        ):
+            bot.add_listener(handler, event)
+
+    def get(self, guild: disnake.Guild) -> GuildStats:
+        stats = self._stats.get(guild.id)
+        if stats is None:
+            stats = self._count(guild)
+            self._stats[guild.id] = stats
+        return stats
+
+    def totals(self) -> dict[str, int]:
+        return {
+            "guilds": len(self._stats),
+            "members": sum(g.member_count or 0 for g in self.bot.guilds),
+            "channels": sum(s.text_channels + s.voice_channels for s in self._stats.values()),
+        }
+
+    def _count(self, guild: disnake.Guild) -> GuildStats:
+        humans = bots = None
+        if self.track_members:
+            bots = sum(1 for m in guild.members if m.bot)
+            humans = len(guild.members) - bots
+        return GuildStats(
+            humans=humans,
+            bots=bots,
+            text_channels=len(guild.text_channels),
+            voice_channels=len(guild.voice_channels),
+            roles=len(guild.roles),
+        )
+
+    # ------------- Event handlers ------------- #
+
+    async def _on_ready(self) -> None:
+        self._stats = {g.id: self._count(g) for g in self.bot.guilds}
+
+    async def rebuild(self, guild: disnake.Guild) -> None:
+        self._stats[guild.id] = self._count(guild)
+
+    async def _on_guild_remove(self, guild: disnake.Guild) -> None:
+        self._stats.pop(guild.id, None)
+
+    def _adjust_member(self, guild_id: int, is_bot: bool, delta: int) -> None:
+        stats = self._stats.get(guild_id)
+        if stats is None or stats.humans is None:
+            return
+        if is_bot:
+            stats.bots += delta
+        else:
+            stats.humans += delta
+
+    async def _on_member_join(self, member: disnake.Member) -> None:
+        self._adjust_member(member.guild.id, member.bot, 1)
+
+    async def _on_raw_member_remove(self, payload: disnake.RawGuildMemberRemoveEvent) -> None:
+        self._adjust_member(payload.guild_id, payload.user.bot, -1)
+
+    def _adjust_channel(self, channel: disnake.abc.GuildChannel, delta: int) -> None:
+        stats = self._stats.get(channel.guild.id)
+        if stats is None:
+            return
+        if isinstance(channel, disnake.TextChannel):
+            stats.text_channels += delta
+        elif isinstance(channel, disnake.VoiceChannel):
+            stats.voice_channels += delta
+
+    async def _on_channel_create(self, channel: disnake.abc.GuildChannel) -> None:
+        self._adjust_channel(channel, 1)
+
+    async def _on_channel_delete(self, channel: disnake.abc.GuildChannel) -> None:
+        self._adjust_channel(channel, -1)
+
+    async def _on_role_create(self, role: disnake.Role) -> None:
+        if (stats := self._stats.get(role.guild.id)) is not None:
+            stats.roles += 1
+
+    async def _on_role_delete(self, role: disnake.Role) -> None:
+        if (stats := self._stats.get(role.guild.id)) is not None:
+            stats.roles -= 1
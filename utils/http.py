@@ -1,43 +1,333 @@
 from __future__ import annotations
 import asyncio
 import json
-from typing import Any, Optional
+import time
+from typing import Any, Callable, Optional
+from urllib.parse import urlsplit
 
 import aiohttp
 
+from . import metrics
+from .breaker import HALF_OPEN, HostHealth
+from .ratelimit import HostLimiter
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+# Connection pool sizing for the shared session. The Pi only ever talks to a
+# handful of upstreams, so a small pool with keep-alive is plenty.
+POOL_LIMIT = 20
+POOL_LIMIT_PER_HOST = 4
+KEEPALIVE_TIMEOUT = 30
+DNS_CACHE_TTL = 300
+
+# Longest a request may queue behind a host's rate limit before it's shed.
+# Kept under Discord's 3s interaction window.
+MAX_QUEUE_WAIT = 2.5
+
+_session: aiohttp.ClientSession | None = None
+
+
+def decode_json(raw: bytes) -> Any:
+    """Decode a JSON body, using orjson when it's installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+Decoder = Callable[[bytes], Any]
+Projector = Callable[[Any], Any]
+
+# Single-flight: concurrent GETs for the same URL + headers share one request.
+_inflight: dict[tuple, asyncio.Task] = {}
+
+# Per-host circuit breaker + latency window.
+_hosts: dict[str, HostHealth] = {}
+
+
+def _host_health(url: str) -> tuple[str, HostHealth]:
+    host = urlsplit(url).hostname or ""
+    health = _hosts.get(host)
+    if health is None:
+        health = _hosts[host] = HostHealth()
+    return host, health
+
+
+def host_stats() -> dict[str, dict]:
+    """Breaker state and latency percentiles for every upstream seen so far."""
+    return {host: health.stats() for host, health in _hosts.items()}
+
+
+# Per-host token bucket fed by x-ratelimit-* / Retry-After headers.
+_limiters: dict[str, HostLimiter] = {}
+
+
+def _limiter(host: str) -> HostLimiter:
+    limiter = _limiters.get(host)
+    if limiter is None:
+        limiter = _limiters[host] = HostLimiter()
+    return limiter
+
+
+def ratelimit_stats() -> dict[str, dict]:
+    """Queue depth, shed count and wait times per upstream host."""
+    return {host: limiter.stats() for host, limiter in _limiters.items()}
+
+
+_RL_QUEUED = metrics.gauge("serpent_ratelimit_queued", "Requests currently waiting for a rate-limit token, by host.")
+_RL_MAX_QUEUED = metrics.gauge("serpent_ratelimit_max_queued", "Most requests ever queued at once, by host.")
+_RL_REQUESTS = metrics.gauge("serpent_ratelimit_requests", "Requests granted or shed by the rate limiter, by host.")
+_RL_WAIT = metrics.gauge("serpent_ratelimit_wait_seconds", "Average and maximum rate-limit queue wait, by host.")
+_RL_BLOCKED = metrics.gauge("serpent_ratelimit_blocked_seconds", "Seconds until a host's rate-limit block lifts.")
+
+
+def _export_ratelimit_stats() -> None:
+    for host, s in ratelimit_stats().items():
+        _RL_QUEUED.set(s["queued"], host=host)
+        _RL_MAX_QUEUED.set(s["max_queued"], host=host)
+        _RL_REQUESTS.set(s["granted"], host=host, outcome="granted")
+        _RL_REQUESTS.set(s["shed"], host=host, outcome="shed")
+        _RL_WAIT.set(s["avg_wait"], host=host, stat="avg")
+        _RL_WAIT.set(s["max_wait"], host=host, stat="max")
+        _RL_BLOCKED.set(s["blocked_for"], host=host)
+
+
+metrics.register_collector(_export_ratelimit_stats)
+
+
+class RequestSkipped(Exception):
+    """The request was never sent: the host's breaker is open or its rate-limit queue is full."""
+
+
+# _fetch_json's result for a request shed by the rate limiter.
+_SKIPPED = object()
+
+
+async def open_session() -> aiohttp.ClientSession:
+    """
+    Open the shared ClientSession if it isn't open yet.
+
+    Called by the bot at startup; _get_json also calls it lazily so helpers
+    still work if they run before the bot has started.
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=POOL_LIMIT,
+            limit_per_host=POOL_LIMIT_PER_HOST,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=DNS_CACHE_TTL,
+        )
+        _session = aiohttp.ClientSession(connector=connector)
+    return _session
+
+
+async def close_session() -> None:
+    """Close the shared ClientSession. Safe to call more than once."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+def _flight_key(url: str, headers: dict | None, *extra: Any) -> tuple:
+    return (url, tuple(sorted((headers or {}).items())), *extra)
+
+
+def _forget_flight(key: tuple, task: asyncio.Task) -> None:
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    # Retrieve the exception so a flight whose waiters all timed out
+    # doesn't log "Task exception was never retrieved".
+    if not task.cancelled():
+        task.exception()
+
 
 async def _get_json(
     url: str,
     *,
     headers: dict | None = None,
     timeout: int = 10,
+    decoder: Decoder | None = None,
+    project: Projector | None = None,
+    ok_statuses: tuple[int, ...] = (200,),
+    max_queue_wait: float = MAX_QUEUE_WAIT,
+    raise_skipped: bool = False,
+    coalesce: bool = True,
 ) -> Optional[dict[str, Any]]:
     """
     Simple JSON HTTP GET helper.
 
-    - New ClientSession per call (no shared-state weirdness).
-    - Optional headers.
-    - Returns parsed JSON dict or None on failure.
+    - Uses the shared, pooled ClientSession (keep-alive + DNS cache).
+    - Optional per-request headers.
+    - Concurrent calls with the same URL and headers share one request;
+      each caller still gives up after its own `timeout`. Pass
+      `coalesce=False` for endpoints that return something random on every
+      call, so each caller gets its own result.
+    - Per-host circuit breaker: while a host is failing, returns None
+      immediately so callers drop straight to their fallbacks.
+    - `timeout` is an upper bound; once enough samples exist the effective
+      timeout follows the host's observed p95 latency. Timeouts count as
+      samples at the value they hit, and half-open probes always get the
+      full `timeout`, so a host that slowed down isn't locked out.
+    - Requests queue behind the host's rate limit (learned from its
+      x-ratelimit headers); if the wait would exceed `max_queue_wait` the
+      request is shed and None is returned straight away.
+    - The body is read once as bytes and handed to `decoder` (orjson if
+      available, stdlib json otherwise).
+    - `project`, if given, maps the decoded payload to just the parts the
+      caller needs, so only that is kept and shared with other waiters.
+    - Bodies are only decoded for `ok_statuses` (e.g. add 404 for APIs that
+      explain "not found" in JSON).
+    - Returns parsed JSON dict or None on failure. The result may be shared
+      between callers, so treat it as read-only.
+    - With `raise_skipped`, a request that was never sent (open breaker or
+      shed) raises RequestSkipped instead of returning None, so callers can
+      tell "we backed off" apart from "the upstream failed".
     """
-    headers = headers or {}
+    host, health = _host_health(url)
+    cap = timeout
+    timeout = health.latency.timeout(cap=cap)
+
+    key = _flight_key(url, headers, decoder, project, ok_statuses)
+    task = _inflight.get(key) if coalesce else None
+    if task is None and not health.breaker.allow():
+        print(f"[http] Circuit open for {host}, skipping {url}")
+        if raise_skipped:
+            raise RequestSkipped(f"circuit open for {host}")
+        return None
+    if health.breaker.state == HALF_OPEN:
+        # The probe (and anyone waiting on it) gets the full cap: the learned
+        # timeout dates from before the host slowed down and would just fail
+        # it again.
+        timeout = cap
+    if task is None:
+        task = asyncio.create_task(
+            _fetch_json(
+                url,
+                headers=headers,
+                timeout=timeout,
+                decoder=decoder,
+                project=project,
+                ok_statuses=ok_statuses,
+                max_queue_wait=max_queue_wait,
+            )
+        )
+        if coalesce:
+            _inflight[key] = task
+        task.add_done_callback(lambda t: _forget_flight(key, t))
+
+    try:
+        # shield: one caller timing out or being cancelled must not cancel
+        # the request the other waiters are sharing.
+        result = await asyncio.wait_for(asyncio.shield(task), timeout + max_queue_wait)
+    except asyncio.TimeoutError:
+        print(f"[http] Timed out waiting for {url}")
+        return None
+    if result is _SKIPPED:
+        if raise_skipped:
+            raise RequestSkipped(f"rate limit queue for {host} is full")
+        return None
+    return result
+
+
+async def _fetch_json(
+    url: str,
+    *,
+    headers: dict | None,
+    timeout: float,
+    decoder: Decoder | None,
+    project: Projector | None,
+    ok_statuses: tuple[int, ...],
+    max_queue_wait: float,
+) -> Any:
+    """Perform the actual GET for _get_json and feed the host's breaker (_SKIPPED if shed)."""
+    host, health = _host_health(url)
+    limiter = _limiter(host)
+    try:
+        admitted = await limiter.acquire(max_queue_wait)
+    except asyncio.CancelledError:
+        health.breaker.release()
+        raise
+    if not admitted:
+        print(f"[http] Rate limit queue for {host} too long, shedding {url}")
+        health.breaker.release()
+        return _SKIPPED
+
+    healthy = False
+    started = time.monotonic()
+    try:
+        result, healthy = await _request_json(
+            url,
+            headers=headers,
+            timeout=timeout,
+            decoder=decoder or decode_json,
+            project=project,
+            ok_statuses=ok_statuses,
+            limiter=limiter,
+        )
+        return result
+    except asyncio.TimeoutError:
+        # Counted at the timeout it hit, so a host that got slower pushes
+        # its learned timeout back up toward the cap.
+        health.latency.add(timeout)
+        return None
+    finally:
+        # Cancellation counts as a failure too, so a half-open probe is
+        # always released.
+        if healthy:
+            health.latency.add(time.monotonic() - started)
+            health.breaker.record_success()
+        else:
+            health.breaker.record_failure()
+
+
+async def _request_json(
+    url: str,
+    *,
+    headers: dict | None,
+    timeout: float,
+    decoder: Decoder,
+    project: Projector | None,
+    ok_statuses: tuple[int, ...],
+    limiter: HostLimiter,
+) -> tuple[Optional[dict[str, Any]], bool]:
+    """Return (parsed JSON or None, whether the host itself looked healthy)."""
+    session = await open_session()
     client_timeout = aiohttp.ClientTimeout(total=timeout)
+    host = urlsplit(url).hostname or ""
+    started = time.monotonic()
+
+    try:
+        async with session.get(url, headers=headers, timeout=client_timeout) as resp:
+            metrics.observe_upstream(host, resp.status, time.monotonic() - started)
+            limiter.update(resp.status, resp.headers)
+            # 429 and 5xx mean the host is struggling; other statuses are
+            # answers, just not useful ones.
+            healthy = resp.status < 500 and resp.status != 429
+            if resp.status not in ok_statuses:
+                print(f"[http] GET {url} -> {resp.status}")
+                return None, healthy
+
+            raw = await resp.read()
+    except asyncio.TimeoutError as e:
+        metrics.observe_upstream(host, type(e).__name__, time.monotonic() - started)
+        print(f"[http] Timed out after {timeout:.1f}s fetching {url}")
+        raise
+    except (aiohttp.ClientError, aiohttp.ServerTimeoutError) as e:
+        metrics.observe_upstream(host, type(e).__name__, time.monotonic() - started)
+        print(f"[http] Error fetching {url}: {e}")
+        return None, False
 
-    async with aiohttp.ClientSession(headers=headers, timeout=client_timeout) as session:
-        try:
-            async with session.get(url) as resp:
-                if resp.status != 200:
-                    print(f"[http] GET {url} -> {resp.status}")
-                    return None
-
-                try:
-                    return await resp.json()
-                except aiohttp.ContentTypeError:
-                    txt = await resp.text()
-                    try:
-                        return json.loads(txt)
-                    except json.JSONDecodeError:
-                        print(f"[http] Non-JSON response from {url}")
-                        return None
-        except (aiohttp.ClientError, aiohttp.ServerTimeoutError, asyncio.TimeoutError) as e:
-            print(f"[http] Error fetching {url}: {e}")
-            return None
+    # Content-Type is ignored on purpose: several upstreams serve JSON as
+    # text/html. Both json.JSONDecodeError and orjson's error are ValueErrors.
+    try:
+        data = decoder(raw)
+    except ValueError:
+        print(f"[http] Non-JSON response from {url}")
+        return None, True
+    if project is not None:
+        data = project(data)
+    return data, True
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import functools
+import time
+from typing import Callable, Iterable
+
+# Opt-in: nothing is recorded until start() is called (METRICS_PORT is set).
+enabled = False
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict[str, object]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(labels: Labels, extra: tuple[tuple[str, str], ...] = ()) -> str:
+    items = labels + extra
+    if not items:
+        return ""
+    esc = lambda v: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _labels(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in self._values.items():
+            yield f"{self.name}{_fmt_labels(labels)} {value}"
+
+
+class Gauge:
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self._values: dict[Labels, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        self._values[_labels(labels)] = value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        for labels, value in self._values.items():
+            yield f"{self.name}{_fmt_labels(labels)} {value}"
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name, self.help, self.buckets = name, help, buckets
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._series: dict[Labels, list[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _labels(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += 1
+        series[-1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in self._series.items():
+            for bound, count in zip(self.buckets, series):
+                yield f"{self.name}_bucket{_fmt_labels(labels, (('le', repr(bound)),))} {count}"
+            yield f"{self.name}_bucket{_fmt_labels(labels, (('le', '+Inf'),))} {series[-2]}"
+            yield f"{self.name}_count{_fmt_labels(labels)} {series[-2]}"
+            yield f"{self.name}_sum{_fmt_labels(labels)} {series[-1]}"
+
+
+COMMANDS = Counter("serpent_commands_total", "Application command invocations.")
+COMMAND_ERRORS = Counter("serpent_command_errors_total", "Application commands that raised.")
+COMMAND_FIRST_RESPONSE = Histogram(
+    "serpent_command_first_response_seconds",
+    "Time from invocation to the first interaction response (defer, message or modal).",
+)
+COMMAND_DURATION = Histogram(
+    "serpent_command_duration_seconds",
+    "Time from invocation until the command handler finished (final response).",
+)
+UPSTREAM_REQUESTS = Counter("serpent_upstream_requests_total", "Outgoing HTTP requests by host and status.")
+UPSTREAM_LATENCY = Histogram("serpent_upstream_latency_seconds", "Outgoing HTTP request latency by host.")
+# Fed by the watchdog's tick (utils/watchdog.py); empty when it is disabled.
+LOOP_LAG = Histogram("serpent_event_loop_lag_seconds", "Event loop scheduling delay.", LOOP_LAG_BUCKETS)
+CACHE_HIT_RATIO = Gauge("serpent_cache_hit_ratio", "Hit ratio per cache.")
+CACHE_SIZE = Gauge("serpent_cache_entries", "Entries (or buffered items) per cache.")
+
+_METRICS = [
+    COMMANDS, COMMAND_ERRORS, COMMAND_FIRST_RESPONSE, COMMAND_DURATION,
+    UPSTREAM_REQUESTS, UPSTREAM_LATENCY, LOOP_LAG, CACHE_HIT_RATIO, CACHE_SIZE,
+]
+
+# Caches report through their own stats() (hit_ratio plus size/depth).
+_caches: dict[str, Callable[[], dict]] = {}
+
+# Run at scrape time to copy other modules' stats() into their gauges.
+_collectors: list[Callable[[], None]] = []
+
+# interaction id -> (started, command name, responded?)
+_invocations: dict[int, list] = {}
+
+_runner = None
+
+
+def register_cache(name: str, stats: Callable[[], dict]) -> None:
+    """Expose a cache's stats() (needs "hit_ratio"; "size" or "depth" optional)."""
+    _caches[name] = stats
+
+
+def gauge(name: str, help: str) -> Gauge:
+    """A new gauge that is included in /metrics."""
+    g = Gauge(name, help)
+    _METRICS.append(g)
+    return g
+
+
+def register_collector(collect: Callable[[], None]) -> None:
+    """Call `collect` before every scrape, e.g. to set gauges from a stats() dict."""
+    _collectors.append(collect)
+
+
+# ------------- Recording hooks ------------- #
+
+def observe_upstream(host: str, status: int | str, seconds: float) -> None:
+    if not enabled:
+        return
+    UPSTREAM_REQUESTS.inc(host=host, status=status)
+    UPSTREAM_LATENCY.observe(seconds, host=host)
+
+
+async def command_started(inter) -> None:
+    """Listener for on_{slash,user,message}_command."""
+    if not enabled:
+        return
+    name = inter.application_command.qualified_name
+    COMMANDS.inc(command=name)
+    _invocations[inter.id] = [time.perf_counter(), name, False]
+
+
+def command_responded(inter_id: int) -> None:
+    entry = _invocations.get(inter_id)
+    if entry is not None and not entry[2]:
+        entry[2] = True
+        COMMAND_FIRST_RESPONSE.observe(time.perf_counter() - entry[0], command=entry[1])
+
+
+async def command_finished(inter, error: BaseException | None = None) -> None:
+    """Listener for *_command_completion; the bot's error handlers pass `error`."""
+    entry = _invocations.pop(inter.id, None)
+    if entry is None:
+        return
+    COMMAND_DURATION.observe(time.perf_counter() - entry[0], command=entry[1])
+    if error is not None:
+        COMMAND_ERRORS.inc(command=entry[1], error=type(error).__name__)
+
+
+# ------------- Exposition ------------- #
+
+def _collect_caches() -> None:
+    for name, stats in list(_caches.items()):
+        try:
+            s = stats()
+        except Exception:
+            continue
+        CACHE_HIT_RATIO.set(s.get("hit_ratio", 0.0), cache=name)
+        size = s.get("size", s.get("depth"))
+        if size is not None:
+            CACHE_SIZE.set(size, cache=name)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    _collect_caches()
+    for collect in _collectors:
+        try:
+            collect()
+        except Exception as e:
+            print(f"[metrics] Collector {getattr(collect, '__qualname__', collect)} failed: {e}")
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _instrument_responses() -> None:
+    """Wrap InteractionResponse so the first defer/message/modal is timed."""
+    import disnake
+
+    for method in ("defer", "send_message", "send_modal"):
+        original = getattr(disnake.InteractionResponse, method)
+        if getattr(original, "_metrics_wrapped", False):
+            continue
+
+        @functools.wraps(original)
+        async def wrapper(self, *args, _original=original, **kwargs):
+            result = await _original(self, *args, **kwargs)
+            command_responded(self._parent.id)
+            return result
+
+        wrapper._metrics_wrapped = True
+        setattr(disnake.InteractionResponse, method, wrapper)
+
+
+async def start(port: int, host: str = "127.0.0.1") -> None:
+    """Enable recording and serve GET /metrics on host:port."""
+    global enabled, _runner
+    from aiohttp import web
+
+    async def handle(_request):
+        return web.Response(text=render(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+    except OSError as e:
+        await runner.cleanup()
+        print(f"[metrics] Could not listen on {host}:{port}: {e}")
+        return
+
+    _runner = runner
+    _instrument_responses()
+    enabled = True
+    print(f"[metrics] Serving Prometheus metrics on http://{host}:{port}/metrics")
+
+
+async def stop() -> None:
+    global enabled, _runner
+    enabled = False
+    if _runner is not None:
+        await _runner.cleanup()
+        _runner = None
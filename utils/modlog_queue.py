@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Callable
+
+import disnake
+
+MAX_EMBEDS_PER_MESSAGE = 10  # Discord's limits
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+
+def _take_batch(queue: deque[disnake.Embed]) -> list[disnake.Embed]:
+    """Pop as many embeds as fit in one message (always at least one)."""
+    batch = [queue.popleft()]
+    chars = len(batch[0])
+    while queue and len(batch) < MAX_EMBEDS_PER_MESSAGE and chars + len(queue[0]) <= MAX_EMBED_CHARS_PER_MESSAGE:
+        chars += len(queue[0])
+        batch.append(queue.popleft())
+    return batch
+
+
+class ModlogQueue:
+    """
+    Per-guild outbox for modlog embeds.
+
+    - put() never waits; a worker per guild drains the queue in the
+      background.
+    - Embeds are packed up to 10 per message and 6000 characters in total.
+      A batch goes out when it is full or `interval` seconds after its first
+      embed arrived.
+    - Rate limits and server errors are retried with backoff; a missing
+      channel or permission drops the batch. Any other 4xx resends the
+      batch one embed at a time, so one bad entry doesn't take the rest
+      with it.
+    - `flush()` sends everything still queued; call it before shutdown.
+    """
+
+    def __init__(
+        self,
+        resolve_channel: Callable[[int], "disnake.abc.Messageable | None"],
+        *,
+        interval: float = 2.0,
+        max_queued: int = 500,
+        retries: int = 3,
+    ):
+        self.resolve_channel = resolve_channel
+        self.interval = interval
+        self.max_queued = max_queued
+        self.retries = retries
+        self._queues: dict[int, deque[disnake.Embed]] = {}
+        self._full: dict[int, asyncio.Event] = {}
+        self._workers: dict[int, asyncio.Task] = {}
+        self._flushing = False
+
+        self.enqueued = 0
+        self.sent_messages = 0
+        self.dropped = 0
+
+    def put(self, guild_id: int, embed: disnake.Embed) -> None:
+        queue = self._queues.setdefault(guild_id, deque())
+        if len(queue) >= self.max_queued:
+            queue.popleft()
+            self.dropped += 1
+        queue.append(embed)
+        self.enqueued += 1
+
+        full = self._full.setdefault(guild_id, asyncio.Event())
+        if len(queue) >= MAX_EMBEDS_PER_MESSAGE:
+            full.set()
+        if guild_id not in self._workers:
+            self._workers[guild_id] = asyncio.get_running_loop().create_task(self._drain(guild_id))
+
+    async def _drain(self, guild_id: int) -> None:
+        queue, full = self._queues[guild_id], self._full[guild_id]
+        try:
+            while queue:
+                if len(queue) < MAX_EMBEDS_PER_MESSAGE and not self._flushing:
+                    try:
+                        await asyncio.wait_for(full.wait(), timeout=self.interval)
+                    except asyncio.TimeoutError:
+                        pass
+                full.clear()
+                await self._send(guild_id, _take_batch(queue))
+        finally:
+            self._workers.pop(guild_id, None)
+            if not queue:
+                self._queues.pop(guild_id, None)
+                self._full.pop(guild_id, None)
+
+    async def _send(self, guild_id: int, batch: list[disnake.Embed]) -> None:
+        for attempt in range(self.retries + 1):
+            channel = self.resolve_channel(guild_id)
+            if channel is None:
+                self.dropped += len(batch)
+                return
+            try:
+                await channel.send(embeds=batch)
+                self.sent_messages += 1
+                return
+            except (disnake.Forbidden, disnake.NotFound):
+                # Bot can't send messages there; silently drop.
+                self.dropped += len(batch)
+                return
+            except disnake.HTTPException as e:
+                if e.status != 429 and e.status < 500:
+                    if len(batch) > 1:
+                        # Don't lose the whole batch to one bad embed.
+                        for embed in batch:
+                            await self._send(guild_id, [embed])
+                        return
+                    print(f"[modlog] Failed to send embed in guild {guild_id}: {e}")
+                    self.dropped += 1
+                    return
+                retry_after = getattr(e, "retry_after", None) or 2 ** attempt
+                await asyncio.sleep(retry_after)
+        print(f"[modlog] Giving up on {len(batch)} embed(s) for guild {guild_id} after {self.retries} retries.")
+        self.dropped += len(batch)
+
+    async def flush(self, timeout: float = 5.0) -> None:
+        """Send everything queued right away and wait up to `timeout` for it."""
+        self._flushing = True
+        for full in self._full.values():
+            full.set()
+        workers = list(self._workers.values())
+        if workers:
+            await asyncio.wait(workers, timeout=timeout)
+
+    def close(self) -> None:
+        left = sum(len(q) for q in self._queues.values())
+        if left:
+            print(f"[modlog] Dropping {left} unsent modlog embed(s) on shutdown.")
+            self.dropped += left
+        for task in self._workers.values():
+            task.cancel()
+        for queue in self._queues.values():
+            queue.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": sum(len(q) for q in self._queues.values()),
+            "enqueued": self.enqueued,
+            "sent_messages": self.sent_messages,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+from . import metrics
+
+# One writer thread for every DebouncedWriter, so writes land in FIFO order.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persist")
+
+# Every live DebouncedWriter, for writer_stats().
+_writers: "weakref.WeakSet[DebouncedWriter]" = weakref.WeakSet()
+
+
+def atomic_write_bytes(path: Path, payload: bytes, *, fsync: bool = True) -> None:
+    """Write to a temp file next to `path`, then rename it over `path`."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with tmp.open("wb") as f:
+        f.write(payload)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def atomic_write_json(path: Path, data: Any, *, indent: int | None = None) -> None:
+    atomic_write_bytes(path, json.dumps(data, indent=indent).encode("utf-8"))
+
+
+def load_json(path: Path, default: Callable[[], Any] = dict) -> Any:
+    """
+    Read a JSON file, or return default() if it doesn't exist.
+
+    A file that exists but can't be parsed is moved aside to
+    <name>.corrupt-<timestamp> (and reported) instead of being silently
+    replaced by an empty document on the next write.
+    """
+    if not path.exists():
+        return default()
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        backup = path.with_name(f"{path.name}.corrupt-{int(time.time())}")
+        try:
+            os.replace(path, backup)
+            print(f"[persist] Could not read {path} ({e}); moved it to {backup}.")
+        except OSError:
+            print(f"[persist] Could not read {path} ({e}).")
+        return default()
+
+
+class DebouncedWriter:
+    """
+    Coalesces saves of one JSON document into at most one write per `delay`.
+
+    - `schedule()` marks the document dirty; the write happens `delay`
+      seconds later, so a burst of changes costs a single write.
+    - The document is serialized on the event loop (so it can't change
+      mid-dump) and written atomically on a worker thread.
+    - `flush_sync()` writes immediately (after any queued writes) and
+      blocks until done; call it on shutdown.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        snapshot: Callable[[], Any],
+        *,
+        delay: float = 1.0,
+        indent: int | None = None,
+        on_written: Callable[[], None] | None = None,
+    ):
+        self.path = path
+        self.snapshot = snapshot
+        self.delay = delay
+        self.indent = indent
+        self.on_written = on_written
+
+        self._dirty = False
+        self._timer: asyncio.TimerHandle | None = None
+        self._task: asyncio.Task | None = None
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.writes = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        _writers.add(self)
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def schedule(self) -> None:
+        self.requests += 1
+        self._dirty = True
+        if self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.delay, self._start_flush)
+
+    def _start_flush(self) -> None:
+        self._timer = None
+        self._task = asyncio.get_running_loop().create_task(self.flush())
+
+    def _serialize(self) -> bytes:
+        self._dirty = False
+        return json.dumps(self.snapshot(), indent=self.indent).encode("utf-8")
+
+    def _write(self, payload: bytes) -> None:
+        with self._lock:
+            started = time.perf_counter()
+            atomic_write_bytes(self.path, payload)
+            elapsed = time.perf_counter() - started
+        self.writes += 1
+        self.total_latency += elapsed
+        self.max_latency = max(self.max_latency, elapsed)
+        if self.on_written is not None:
+            self.on_written()
+
+    async def flush(self) -> None:
+        self._cancel_timer()
+        if not self._dirty:
+            return
+        payload = self._serialize()
+        try:
+            await asyncio.get_running_loop().run_in_executor(_executor, self._write, payload)
+        except OSError as e:
+            print(f"[persist] Failed to write {self.path}: {e}; retrying.")
+            self.schedule()
+
+    def flush_sync(self) -> None:
+        self._cancel_timer()
+        if self._dirty:
+            # Through the shared worker, so payloads flush() already queued
+            # land first instead of overwriting this one afterwards.
+            _executor.submit(self._write, self._serialize()).result()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def stats(self) -> dict[str, float | int]:
+        return {
+            "requests": self.requests,
+            "writes": self.writes,
+            "avg_latency": self.total_latency / self.writes if self.writes else 0.0,
+            "max_latency": self.max_latency,
+            "pending": self._dirty,
+        }
+
+
+def writer_stats() -> dict[str, dict]:
+    """stats() of every DebouncedWriter, keyed by file path."""
+    return {str(w.path): w.stats() for w in list(_writers)}
+
+
+_WRITER_REQUESTS = metrics.gauge("serpent_persist_requests", "Save requests per file (before debouncing).")
+_WRITER_WRITES = metrics.gauge("serpent_persist_writes", "Actual atomic writes per file.")
+_WRITER_LATENCY = metrics.gauge("serpent_persist_write_seconds", "Average and maximum write latency per file.")
+
+
+def _export_writer_stats() -> None:
+    for path, s in writer_stats().items():
+        _WRITER_REQUESTS.set(s["requests"], path=path)
+        _WRITER_WRITES.set(s["writes"], path=path)
+        _WRITER_LATENCY.set(s["avg_latency"], path=path, stat="avg")
+        _WRITER_LATENCY.set(s["max_latency"], path=path, stat="max")
+
+
+metrics.register_collector(_export_writer_stats)
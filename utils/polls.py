@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import time
+import uuid
+from pathlib import Path
+
+from .persist import DebouncedWriter, load_json
+
+POLLS_FILE = Path("data") / "polls.json"
+CUSTOM_ID_PREFIX = "poll:"
+
+
+def poll_custom_id(poll_id: str, option: int) -> str:
+    return f"{CUSTOM_ID_PREFIX}{poll_id}:{option}"
+
+
+def parse_custom_id(custom_id: str) -> tuple[str, int] | None:
+    """(poll_id, option) for a poll button custom_id, else None."""
+    if not custom_id.startswith(CUSTOM_ID_PREFIX):
+        return None
+    try:
+        poll_id, option = custom_id[len(CUSTOM_ID_PREFIX):].rsplit(":", 1)
+        return poll_id, int(option)
+    except ValueError:
+        return None
+
+
+class PollStore:
+    """
+    Open polls and their votes, persisted to data/polls.json.
+
+    Votes are stored as {user_id: option_index}; per-option tallies are kept
+    alongside in memory so rendering never walks the voter list.
+    """
+
+    def __init__(self, path: Path = POLLS_FILE):
+        self.polls: dict[str, dict] = {p["id"]: p for p in load_json(path, default=list)}
+        self.tallies: dict[str, list[int]] = {}
+        for poll in self.polls.values():
+            counts = [0] * len(poll["options"])
+            for idx in poll["votes"].values():
+                counts[idx] += 1
+            self.tallies[poll["id"]] = counts
+        self.writer = DebouncedWriter(path, lambda: list(self.polls.values()), delay=5.0)
+
+    def create(self, *, channel_id: int, question: str, options: list[str], duration: float) -> dict:
+        poll = {
+            # Never reused: a closed poll whose buttons couldn't be disabled
+            # must not route votes to a newer poll.
+            "id": uuid.uuid4().hex,
+            "channel_id": channel_id,
+            "message_id": None,
+            "question": question,
+            "options": options,
+            "closes": time.time() + duration,
+            "votes": {},
+        }
+        self.polls[poll["id"]] = poll
+        self.tallies[poll["id"]] = [0] * len(options)
+        self.writer.schedule()
+        return poll
+
+    def set_message(self, poll_id: str, message_id: int) -> None:
+        self.polls[poll_id]["message_id"] = message_id
+        self.writer.schedule()
+
+    def vote(self, poll_id: str, user_id: int, option: int) -> bool | None:
+        """
+        Toggle a vote. Returns True if the vote was cast, False if it was
+        removed, or None if the poll/option doesn't exist.
+        """
+        poll = self.polls.get(poll_id)
+        if poll is None or not 0 <= option < len(poll["options"]):
+            return None
+        votes, tallies = poll["votes"], self.tallies[poll_id]
+        uid = str(user_id)
+        prev = votes.get(uid)
+        if prev is not None:
+            tallies[prev] -= 1
+        if prev == option:
+            del votes[uid]
+            cast = False
+        else:
+            votes[uid] = option
+            tallies[option] += 1
+            cast = True
+        self.writer.schedule()
+        return cast
+
+    def close(self, poll_id: str) -> tuple[dict, list[int]] | None:
+        poll = self.polls.pop(poll_id, None)
+        if poll is None:
+            return None
+        self.writer.schedule()
+        return poll, self.tallies.pop(poll_id)
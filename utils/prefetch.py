@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+
+class PrefetchBuffer:
+    """
+    Bounded queue of ready-to-use items filled in the background.
+
+    The owner calls `fill()` periodically (e.g. from a tasks.loop); consumers
+    call `get()` and fall back to a live fetch when it returns None.
+    """
+
+    def __init__(self, producer: Callable[[], Awaitable[Optional[str]]], maxsize: int = 10):
+        self.producer = producer
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=maxsize)
+        self.hits = 0
+        self.misses = 0
+        self.produced = 0
+        self.failed = 0
+
+    def get(self) -> Optional[str]:
+        try:
+            item = self.queue.get_nowait()
+        except asyncio.QueueEmpty:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return item
+
+    async def fill(self, max_items: int = 1) -> int:
+        """Fetch up to `max_items` new items if there's room. Returns how many were added."""
+        added = 0
+        while added < max_items and not self.queue.full():
+            item = await self.producer()
+            if item is None:
+                self.failed += 1
+                break
+            self.queue.put_nowait(item)
+            self.produced += 1
+            added += 1
+        return added
+
+    def stats(self) -> dict[str, int | float]:
+        served = self.hits + self.misses
+        return {
+            "depth": self.queue.qsize(),
+            "maxsize": self.queue.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / served if served else 0.0,
+            "produced": self.produced,
+            "failed": self.failed,
+        }
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Mapping
+
+
+class HostLimiter:
+    """
+    Token bucket for one upstream host, kept in sync with its rate-limit headers.
+
+    - Callers reserve a token with `acquire()`; if none is free they queue
+      (sleep) until theirs comes up, in FIFO order.
+    - If the wait would exceed `max_wait`, the request is shed instead.
+    - A caller cancelled while queued gets its token refunded.
+    - `update()` reads x-ratelimit-remaining / x-ratelimit-reset (Reddit)
+      or Retry-After on 429, and reshapes the bucket to match.
+    """
+
+    def __init__(self, rate: float = 5.0, burst: float = 10.0):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+        self.queued = 0
+        self.max_queued = 0
+        self.shed = 0
+        self.granted = 0
+        self.total_wait = 0.0
+        self.max_wait_seen = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """How long a request made now would have to queue."""
+        now = time.monotonic()
+        self._refill(now)
+        blocked = max(0.0, self.blocked_until - now)
+        short = max(0.0, 1 - self.tokens)
+        return max(blocked, short / self.rate)
+
+    async def acquire(self, max_wait: float) -> bool:
+        wait = self.wait_time()
+        if wait > max_wait:
+            self.shed += 1
+            return False
+
+        # Reserve now; tokens going negative is the queue.
+        self.tokens -= 1
+        self.granted += 1
+        self.total_wait += wait
+        self.max_wait_seen = max(self.max_wait_seen, wait)
+        if wait > 0:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Never used: give the token back so cancelled waiters
+                # (timeouts, lost hedges) don't drain the bucket.
+                self._refill(time.monotonic())
+                self.tokens = min(self.capacity, self.tokens + 1)
+                self.granted -= 1
+                self.total_wait -= wait
+                raise
+            finally:
+                self.queued -= 1
+        return True
+
+    def update(self, status: int, headers: Mapping[str, str]) -> None:
+        now = time.monotonic()
+        self._refill(now)
+
+        remaining = _float(headers.get("x-ratelimit-remaining"))
+        reset = _float(headers.get("x-ratelimit-reset"))
+        retry_after = _float(headers.get("retry-after"))
+
+        if status == 429:
+            pause = retry_after or reset or 5.0
+            self.blocked_until = max(self.blocked_until, now + pause)
+            self.tokens = min(self.tokens, 0.0)
+            return
+
+        if remaining is None or reset is None or reset <= 0:
+            return
+
+        if remaining < 1:
+            self.blocked_until = max(self.blocked_until, now + reset)
+            self.tokens = min(self.tokens, 0.0)
+        else:
+            # Spread what's left of the window evenly until it resets.
+            self.rate = max(remaining / reset, 0.01)
+            self.tokens = min(self.tokens, remaining)
+
+    def stats(self) -> dict[str, float | int]:
+        return {
+            "rate": round(self.rate, 3),
+            "tokens": round(self.tokens, 2),
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "granted": self.granted,
+            "shed": self.shed,
+            "avg_wait": self.total_wait / self.granted if self.granted else 0.0,
+            "max_wait": self.max_wait_seen,
+            "blocked_for": max(0.0, self.blocked_until - time.monotonic()),
+        }
+
+
+def _float(value: str | None) -> float | None:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
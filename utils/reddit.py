@@ -1,5 +1,12 @@
+import asyncio
 import random
-from .http import _get_json
+from collections import deque
+from urllib.parse import urlsplit
+
+from . import metrics
+from .cache import MISS, STALE, TTLCache
+from .dedup import RecentlyShown
+from .http import RequestSkipped, _get_json
 
 UA_WINDOWS = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -13,8 +20,167 @@ UA_LINUX = (
     "Chrome/120.0.0.0 Safari/537.36"
 )
 
+USER_AGENTS = {
+    "windows": UA_WINDOWS,
+    "linux": UA_LINUX,
+}
+
 BASE_URL = "https://old.reddit.com"
 
+# If the preferred UA hasn't answered after this long (and it has been
+# failing lately), a second request with the other UA is started in parallel.
+HEDGE_DELAY = 1.0
+
+
+class UAStrategy:
+    """
+    Remembers which User-Agent last worked for each host and tracks
+    per-UA success rates over a rolling window.
+    """
+
+    def __init__(self, agents: dict[str, str], *, window: int = 20, degraded_below: float = 0.8):
+        self.agents = agents
+        self.degraded_below = degraded_below
+        self._preferred: dict[str, str] = {}
+        self._recent: dict[str, deque[bool]] = {name: deque(maxlen=window) for name in agents}
+        self._totals: dict[str, list[int]] = {name: [0, 0] for name in agents}  # [ok, total]
+
+    def order(self, host: str) -> list[str]:
+        """UA names for this host, preferred one first."""
+        names = list(self.agents)
+        preferred = self._preferred.get(host)
+        if preferred in names:
+            names.remove(preferred)
+            names.insert(0, preferred)
+        return names
+
+    def record(self, host: str, name: str, ok: bool) -> None:
+        self._recent[name].append(ok)
+        totals = self._totals[name]
+        totals[1] += 1
+        if ok:
+            totals[0] += 1
+            self._preferred[host] = name
+
+    def success_rate(self, name: str) -> float | None:
+        recent = self._recent[name]
+        if not recent:
+            return None
+        return sum(recent) / len(recent)
+
+    def is_degraded(self, name: str) -> bool:
+        recent = self._recent[name]
+        if not recent:
+            return False
+        return not recent[-1] or self.success_rate(name) < self.degraded_below
+
+    def stats(self) -> dict[str, dict]:
+        out = {}
+        for name, (ok, total) in self._totals.items():
+            out[name] = {
+                "ok": ok,
+                "total": total,
+                "recent_success_rate": self.success_rate(name),
+            }
+        return out
+
+
+_ua = UAStrategy(USER_AGENTS)
+
+
+def ua_stats() -> dict[str, dict]:
+    """Per-UA success counters, e.g. to see which UA Reddit is blocking."""
+    return _ua.stats()
+
+
+_UA_REQUESTS = metrics.gauge("serpent_reddit_ua_requests", "Reddit listing requests per User-Agent.")
+_UA_SUCCESS = metrics.gauge("serpent_reddit_ua_success_ratio", "Recent Reddit success rate per User-Agent.")
+
+
+def _export_ua_stats() -> None:
+    for name, s in _ua.stats().items():
+        _UA_REQUESTS.set(s["ok"], ua=name, outcome="ok")
+        _UA_REQUESTS.set(s["total"] - s["ok"], ua=name, outcome="failed")
+        if s["recent_success_rate"] is not None:
+            _UA_SUCCESS.set(s["recent_success_rate"], ua=name)
+
+
+metrics.register_collector(_export_ua_stats)
+
+
+# Fields of a post's "data" object that the candidate filter reads.
+LISTING_FIELDS = ("url_overridden_by_dest", "url", "over_18")
+
+
+def project_listing(payload) -> list[dict]:
+    """Reduce a listing payload to [{field: value}] for LISTING_FIELDS only."""
+    if not isinstance(payload, dict):
+        return []
+    children = (payload.get("data") or {}).get("children") or []
+    posts = []
+    for child in children:
+        pdata = child.get("data") or {}
+        posts.append({field: pdata.get(field) for field in LISTING_FIELDS})
+    return posts
+
+
+# _get_with_ua's result when the request was never sent (breaker open / shed).
+# It says nothing about the UA, so it isn't recorded and stops further tries.
+SKIPPED = object()
+
+
+async def _get_with_ua(url: str, host: str, name: str):
+    try:
+        payload = await _get_json(
+            url,
+            headers={"User-Agent": USER_AGENTS[name]},
+            project=project_listing,
+            raise_skipped=True,
+        )
+    except RequestSkipped:
+        return SKIPPED
+    _ua.record(host, name, payload is not None)
+    return payload
+
+
+async def _get_listing(url: str):
+    """
+    Fetch a listing, trying the UA that last worked for this host first.
+
+    If that UA is degraded, a hedged request with the next UA is started after
+    HEDGE_DELAY and whichever succeeds first wins. Losing requests are left to
+    finish on their own so their outcome still counts toward the UA stats.
+    """
+    host = urlsplit(url).hostname or ""
+    first, *rest = _ua.order(host)
+
+    if not _ua.is_degraded(first):
+        payload = await _get_with_ua(url, host, first)
+        for name in rest:
+            if payload is not None:
+                break
+            print(f"[reddit] {first} UA failed, retrying with {name} UA...")
+            payload = await _get_with_ua(url, host, name)
+        return None if payload is SKIPPED else payload
+
+    pending = {asyncio.create_task(_get_with_ua(url, host, first))}
+    for name in rest:
+        done, pending = await asyncio.wait(pending, timeout=HEDGE_DELAY, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.result() is SKIPPED:
+                return None  # the host is being backed off; don't hedge into it
+            if task.result() is not None:
+                return task.result()
+        pending.add(asyncio.create_task(_get_with_ua(url, host, name)))
+
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.result() not in (None, SKIPPED):
+                return task.result()
+    return None
+
+
 def _image_from_post(post: dict, allow_nsfw: bool) -> str | None:
     data = post.get("data", {}) or {}
     if data.get("over_18") and not allow_nsfw:
@@ -37,54 +203,102 @@ def _image_from_post(post: dict, allow_nsfw: bool) -> str | None:
         return None
     return None
 
-async def fetch_random_reddit_image(
-    subreddit: str,
-    *,
-    sort: str = "hot",
-    t: str = "day",
-    limit: int = 50,
-    allow_nsfw: bool = False,
-):
-    url = f"{BASE_URL}/r/{subreddit}/{sort}.json?limit={limit}&t={t}"
 
-    # Try Windows UA first
-    payload = await _get_json(
-        url,
-        headers={"User-Agent": UA_WINDOWS},
-    )
+# Filtered candidate pools per (subreddit, sort, t, allow_nsfw). Fresh for a few
+# minutes, then served stale while a background refresh runs.
+LISTING_TTL = 180
+LISTING_MAX_STALE = 1800
+LISTING_CACHE_SIZE = 64
 
-    # If FAILS → try Linux/Pi UA
-    if payload is None:
-        print("[reddit] Windows UA failed, retrying with Linux UA...")
-        payload = await _get_json(
-            url,
-            headers={"User-Agent": UA_LINUX},
-        )
+_listing_cache = TTLCache(maxsize=LISTING_CACHE_SIZE, ttl=LISTING_TTL, max_stale=LISTING_MAX_STALE)
+metrics.register_cache("reddit_listings", _listing_cache.stats)
+_refreshing: dict[tuple, asyncio.Task] = {}
+
+# Per-channel memory of the last RECENT_PER_CHANNEL images served.
+RECENT_PER_CHANNEL = 30
+_recently_shown = RecentlyShown(per_key=RECENT_PER_CHANNEL)
 
-    # If STILL fails → give up
-    if payload is None:
-        print("[reddit] Both UAs failed. Giving up.")
-        return None
 
-    # Same parsing logic as before below
-    posts = payload.get("data", {}).get("children", [])
-    if not posts:
+def listing_cache_stats() -> dict:
+    """Hit/miss counters for the Reddit listing cache."""
+    return _listing_cache.stats()
+
+
+async def _fetch_candidates(
+    subreddit: str,
+    *,
+    sort: str,
+    t: str,
+    limit: int,
+    allow_nsfw: bool,
+) -> list[str] | None:
+    """Download a listing and return its image URLs, or None if the fetch failed."""
+    url = f"{BASE_URL}/r/{subreddit}/{sort}.json?limit={limit}&t={t}"
+
+    posts = await _get_listing(url)
+    if posts is None:
+        print("[reddit] All UAs failed. Giving up.")
         return None
 
     candidates = []
-    for post in posts:
-        pdata = post.get("data", {})
-        img = pdata.get("url_overridden_by_dest") or pdata.get("url")
+    for pdata in posts:
+        img = pdata["url_overridden_by_dest"] or pdata["url"]
         if not img:
             continue
 
-        if not allow_nsfw and pdata.get("over_18"):
+        if not allow_nsfw and pdata["over_18"]:
             continue
 
         if img.lower().endswith((".jpg", ".jpeg", ".png", ".gif")):
             candidates.append(img)
 
+    return candidates
+
+
+async def _refresh(key: tuple, **kwargs) -> None:
+    try:
+        candidates = await _fetch_candidates(**kwargs)
+        if candidates:
+            _listing_cache.set(key, candidates)
+    finally:
+        _refreshing.pop(key, None)
+
+
+async def fetch_random_reddit_image(
+    subreddit: str,
+    *,
+    sort: str = "hot",
+    t: str = "day",
+    limit: int = 50,
+    allow_nsfw: bool = False,
+    channel_id: int | None = None,
+):
+    """
+    Random image URL from a subreddit listing, or None.
+
+    With `channel_id`, images recently shown in that channel are skipped
+    until the pool runs out.
+    """
+    key = (subreddit.lower(), sort, t, allow_nsfw)
+    fetch_kwargs = dict(subreddit=subreddit, sort=sort, t=t, limit=limit, allow_nsfw=allow_nsfw)
+
+    candidates, state = _listing_cache.lookup(key)
+
+    if state == STALE and key not in _refreshing:
+        _refreshing[key] = asyncio.create_task(_refresh(key, **fetch_kwargs))
+
+    if state == MISS:
+        candidates = await _fetch_candidates(**fetch_kwargs)
+        # Empty pools aren't cached so a bad moment on Reddit doesn't stick.
+        if candidates:
+            _listing_cache.set(key, candidates)
+
     if not candidates:
         return None
 
-    return random.choice(candidates)
+    if channel_id is None:
+        return random.choice(candidates)
+
+    pick = random.choice(_recently_shown.filter(channel_id, candidates))
+    _recently_shown.mark(channel_id, pick)
+    return pick
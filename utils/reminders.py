@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import itertools
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from .persist import DebouncedWriter, load_json
+from .scheduler import Scheduler
+
+REMINDERS_FILE = Path("data") / "reminders.json"
+
+# A failed delivery is retried after RETRY_BASE seconds, doubling up to
+# RETRY_MAX, and given up after MAX_ATTEMPTS tries (about a day).
+RETRY_BASE = 30.0
+RETRY_MAX = 3600.0
+MAX_ATTEMPTS = 30
+
+
+class Reminders:
+    """
+    Persistent reminders driven by a single Scheduler task.
+
+    Each reminder is a JSON-friendly dict:
+    {"id", "user_id", "channel_id", "message", "dm", "created", "due"}
+    with wall-clock timestamps. Pending reminders live in data/reminders.json
+    and are rescheduled on startup; ones that came due while the bot was
+    down are delivered as soon as start() runs.
+
+    A reminder is only removed once `deliver` returns. If it raises (e.g.
+    Discord is down), the reminder stays pending and is retried with a
+    capped backoff; the attempt count is kept in its "attempts" field.
+    """
+
+    def __init__(self, deliver: Callable[[dict], Awaitable[None]], path: Path = REMINDERS_FILE):
+        self.deliver = deliver
+        self._pending: dict[str, dict] = {}
+        for r in load_json(path, default=list):
+            self._pending[r["id"]] = r
+        self.writer = DebouncedWriter(path, lambda: list(self._pending.values()))
+        self.scheduler = Scheduler(self._fire)
+        for r in self._pending.values():
+            self.scheduler.add(r["id"], r["due"])
+        ids = (int(k) for k in self._pending if k.isdigit())
+        self._ids = itertools.count(max(ids, default=0) + 1)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        self.scheduler.start()
+
+    def close(self) -> None:
+        self.scheduler.stop()
+        self.writer.flush_sync()
+
+    def add(self, *, user_id: int, channel_id: int | None, message: str, dm: bool, delay: float) -> dict:
+        now = time.time()
+        reminder = {
+            "id": str(next(self._ids)),
+            "user_id": user_id,
+            "channel_id": channel_id,
+            "message": message,
+            "dm": dm,
+            "created": now,
+            "due": now + delay,
+        }
+        self._pending[reminder["id"]] = reminder
+        self.scheduler.add(reminder["id"], reminder["due"])
+        self.writer.schedule()
+        return reminder
+
+    async def _fire(self, reminder_id: str) -> None:
+        reminder = self._pending.get(reminder_id)
+        if reminder is None:
+            return
+        try:
+            await self.deliver(reminder)
+        except Exception as e:
+            attempts = reminder.get("attempts", 0) + 1
+            if attempts >= MAX_ATTEMPTS:
+                print(f"[remindme] Giving up on reminder {reminder_id} after {attempts} attempts: {e}")
+            else:
+                reminder["attempts"] = attempts
+                delay = min(RETRY_MAX, RETRY_BASE * 2 ** (attempts - 1))
+                print(f"[remindme] Delivering reminder {reminder_id} failed ({e}); retrying in {delay:.0f}s.")
+                self.scheduler.add(reminder_id, time.time() + delay)
+                self.writer.schedule()
+                return
+        self._pending.pop(reminder_id, None)
+        self.writer.schedule()
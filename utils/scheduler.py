@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Awaitable, Callable, Hashable
+
+
+class Scheduler:
+    """
+    Runs `callback(key)` when each key comes due, using one task and a min-heap.
+
+    - Due times are wall-clock (time.time()) so they survive restarts when
+      the caller persists them.
+    - The task sleeps until the earliest due time and is woken early only
+      when something earlier is added.
+    - Items already overdue at start() fire immediately.
+    """
+
+    def __init__(self, callback: Callable[[Hashable], Awaitable[None]]):
+        self.callback = callback
+        self._heap: list[tuple[float, int, Hashable]] = []
+        self._due: dict[Hashable, float] = {}  # live keys; heap entries not here are cancelled
+        self._seq = itertools.count()
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def add(self, key: Hashable, due: float) -> None:
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, next(self._seq), key))
+        if self._heap[0][2] == key:
+            self._wake.set()
+
+    def cancel(self, key: Hashable) -> bool:
+        """Forget a key. Its heap entry is dropped lazily when it reaches the top."""
+        return self._due.pop(key, None) is not None
+
+    def next_due(self) -> float | None:
+        self._drop_cancelled()
+        return self._heap[0][0] if self._heap else None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _drop_cancelled(self) -> None:
+        while self._heap:
+            due, _, key = self._heap[0]
+            if self._due.get(key) == due:
+                return
+            heapq.heappop(self._heap)
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            due = self.next_due()
+            if due is None:
+                await self._wake.wait()
+                continue
+
+            delay = due - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                    continue  # something earlier was added; re-check the top
+                except asyncio.TimeoutError:
+                    pass
+
+            now = time.time()
+            while (due := self.next_due()) is not None and due <= now:
+                _, _, key = heapq.heappop(self._heap)
+                del self._due[key]
+                task = asyncio.create_task(self._fire(key))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+    async def _fire(self, key: Hashable) -> None:
+        try:
+            await self.callback(key)
+        except Exception as e:
+            print(f"[scheduler] Callback for {key!r} failed: {e}")
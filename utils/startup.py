@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import time
+
+
+class StartupReport:
+    """
+    Milestone timings for one bot start, relative to `started`.
+
+    mark() records when a phase finished; the report lists each phase's
+    duration (time since the previous milestone) and its offset from start.
+    Extension load times are kept separately so slow cogs stand out.
+    """
+
+    def __init__(self, started: float | None = None):
+        self.started = time.perf_counter() if started is None else started
+        self.milestones: dict[str, float] = {}
+        self.extensions: dict[str, float] = {}
+        self.reported = False
+
+    def mark(self, phase: str) -> None:
+        self.milestones.setdefault(phase, time.perf_counter() - self.started)
+
+    def has(self, phase: str) -> bool:
+        return phase in self.milestones
+
+    def extension(self, name: str, seconds: float) -> None:
+        self.extensions[name] = seconds
+
+    def lines(self) -> list[str]:
+        out = ["[startup] Startup report:"]
+        prev = 0.0
+        for phase, at in sorted(self.milestones.items(), key=lambda kv: kv[1]):
+            out.append(f"[startup]   {phase:<14} {at - prev:7.2f}s  (t={at:.2f}s)")
+            prev = at
+        for name, seconds in sorted(self.extensions.items(), key=lambda kv: -kv[1]):
+            out.append(f"[startup]     {name:<20} {seconds * 1000:7.0f}ms")
+        return out
+
+    def print(self) -> None:
+        self.reported = True
+        print("\n".join(self.lines()))
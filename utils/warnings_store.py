@@ -0,0 +1,507 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+from .persist import DebouncedWriter, atomic_write_bytes, atomic_write_json, load_json
+
+DATA_DIR = Path("data")
+WARN_FILE = DATA_DIR / "warnings.json"
+WARN_DB = DATA_DIR / "warnings.db"
+
+
+class WarningsStore(ABC):
+    """
+    Storage interface for moderation warnings.
+
+    A warning is a dict with "mod_id", "reason" and "timestamp" (ISO 8601).
+    All methods except close() are coroutines; implementations keep
+    blocking I/O off the event loop. A backend missing one of them fails
+    when it is instantiated, not when a command first needs it.
+    """
+
+    @abstractmethod
+    async def add(self, guild_id: int, user_id: int, warning: dict) -> int:
+        """Store a warning and return the user's new warning count."""
+
+    @abstractmethod
+    async def fetch(self, guild_id: int, user_id: int) -> list[dict]:
+        """All warnings for a user, oldest first."""
+
+    @abstractmethod
+    async def clear(self, guild_id: int, user_id: int) -> int:
+        """Delete a user's warnings and return how many were removed."""
+
+    @abstractmethod
+    async def count(self, guild_id: int, user_id: int) -> int:
+        """How many warnings a user has."""
+
+    @abstractmethod
+    async def page(
+        self,
+        guild_id: int,
+        user_id: int,
+        cursor: Any = None,
+        limit: int = 5,
+    ) -> tuple[list[dict], Any]:
+        """
+        One page of a user's warnings, oldest first.
+
+        Pass the returned cursor back to get the following page; it is None
+        once there are no more. Cursors are opaque to callers.
+        """
+
+    def close(self) -> None:
+        """Finish pending work and release resources (called from cog_unload)."""
+
+
+class _ThreadedStore(WarningsStore):
+    """Runs blocking calls on one dedicated worker thread, one at a time."""
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="warnings")
+
+    async def _run(self, fn: Callable, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+class _InMemoryStore(WarningsStore):
+    """Read side for backends that keep {guild_id: {user_id: [warning, ...]}} in self._data."""
+
+    _data: dict
+
+    def _user_warnings(self, guild_id: int, user_id: int) -> list[dict]:
+        return self._data.get(str(guild_id), {}).get(str(user_id), [])
+
+    async def fetch(self, guild_id: int, user_id: int) -> list[dict]:
+        return list(self._user_warnings(guild_id, user_id))
+
+    async def count(self, guild_id: int, user_id: int) -> int:
+        return len(self._user_warnings(guild_id, user_id))
+
+    async def page(self, guild_id: int, user_id: int, cursor: Any = None, limit: int = 5) -> tuple[list[dict], Any]:
+        warnings = self._user_warnings(guild_id, user_id)
+        offset = cursor or 0
+        end = offset + limit
+        return warnings[offset:end], (end if end < len(warnings) else None)
+
+
+# ------------- JSON backend (legacy) ------------- #
+
+class JsonWarningsStore(_InMemoryStore):
+    """
+    The original warnings.json format: {guild_id: {user_id: [warning, ...]}}.
+
+    The document is loaded once and kept in memory; saves are debounced,
+    atomic and written off the event loop.
+    """
+
+    def __init__(self, path: Path = WARN_FILE):
+        self.path = path
+        self._data: dict = load_json(path)
+        self.writer = DebouncedWriter(path, lambda: self._data)
+
+    async def add(self, guild_id: int, user_id: int, warning: dict) -> int:
+        user_warnings = self._data.setdefault(str(guild_id), {}).setdefault(str(user_id), [])
+        user_warnings.append(warning)
+        self.writer.schedule()
+        return len(user_warnings)
+
+    async def clear(self, guild_id: int, user_id: int) -> int:
+        guild_key = str(guild_id)
+        guild_warnings = self._data.get(guild_key, {})
+        removed = guild_warnings.pop(str(user_id), None)
+        if not removed:
+            return 0
+        if not guild_warnings:
+            self._data.pop(guild_key, None)
+        self.writer.schedule()
+        return len(removed)
+
+    def close(self) -> None:
+        self.writer.flush_sync()
+
+
+# ------------- SQLite backend ------------- #
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS warnings (
+    id        INTEGER PRIMARY KEY,
+    guild_id  INTEGER NOT NULL,
+    user_id   INTEGER NOT NULL,
+    mod_id    INTEGER,
+    reason    TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS warnings_guild_user_ts
+    ON warnings (guild_id, user_id, timestamp);
+"""
+
+
+class SqliteWarningsStore(_ThreadedStore):
+    """SQLite (WAL) backend; each command only touches the rows it needs."""
+
+    def __init__(self, path: Path = WARN_DB):
+        super().__init__()
+        self.path = path
+        path.parent.mkdir(exist_ok=True)
+        # The connection is only ever used from the single worker thread
+        # (apart from this setup, which runs before any worker call).
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def is_empty(self) -> bool:
+        return self._db.execute("SELECT 1 FROM warnings LIMIT 1").fetchone() is None
+
+    def _add(self, guild_id: int, user_id: int, warning: dict) -> int:
+        with self._db:
+            self._db.execute(
+                "INSERT INTO warnings (guild_id, user_id, mod_id, reason, timestamp) VALUES (?, ?, ?, ?, ?)",
+                (guild_id, user_id, warning.get("mod_id"), warning.get("reason", ""), warning.get("timestamp", "")),
+            )
+        return self._count(guild_id, user_id)
+
+    def _count(self, guild_id: int, user_id: int) -> int:
+        row = self._db.execute(
+            "SELECT COUNT(*) FROM warnings WHERE guild_id = ? AND user_id = ?",
+            (guild_id, user_id),
+        ).fetchone()
+        return row[0]
+
+    def _fetch(self, guild_id: int, user_id: int) -> list[dict]:
+        rows = self._db.execute(
+            "SELECT mod_id, reason, timestamp FROM warnings"
+            " WHERE guild_id = ? AND user_id = ? ORDER BY timestamp, id",
+            (guild_id, user_id),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _page(self, guild_id: int, user_id: int, cursor: tuple | None, limit: int) -> tuple[list[dict], tuple | None]:
+        # Keyset pagination on (timestamp, id), served by the
+        # (guild_id, user_id, timestamp) index; one extra row tells us
+        # whether another page exists.
+        if cursor is None:
+            rows = self._db.execute(
+                "SELECT id, mod_id, reason, timestamp FROM warnings"
+                " WHERE guild_id = ? AND user_id = ?"
+                " ORDER BY timestamp, id LIMIT ?",
+                (guild_id, user_id, limit + 1),
+            ).fetchall()
+        else:
+            ts, last_id = cursor
+            rows = self._db.execute(
+                "SELECT id, mod_id, reason, timestamp FROM warnings"
+                " WHERE guild_id = ? AND user_id = ?"
+                " AND (timestamp > ? OR (timestamp = ? AND id > ?))"
+                " ORDER BY timestamp, id LIMIT ?",
+                (guild_id, user_id, ts, ts, last_id, limit + 1),
+            ).fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = (rows[-1]["timestamp"], rows[-1]["id"]) if more else None
+        return [{k: row[k] for k in ("mod_id", "reason", "timestamp")} for row in rows], next_cursor
+
+    def _clear(self, guild_id: int, user_id: int) -> int:
+        with self._db:
+            cur = self._db.execute(
+                "DELETE FROM warnings WHERE guild_id = ? AND user_id = ?",
+                (guild_id, user_id),
+            )
+        return cur.rowcount
+
+    def _import(self, data: dict) -> int:
+        rows = []
+        for guild_key, users in data.items():
+            for user_key, warnings in users.items():
+                for w in warnings:
+                    rows.append((
+                        int(guild_key),
+                        int(user_key),
+                        w.get("mod_id"),
+                        w.get("reason", ""),
+                        w.get("timestamp", ""),
+                    ))
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO warnings (guild_id, user_id, mod_id, reason, timestamp) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    async def add(self, guild_id: int, user_id: int, warning: dict) -> int:
+        return await self._run(self._add, guild_id, user_id, warning)
+
+    async def fetch(self, guild_id: int, user_id: int) -> list[dict]:
+        return await self._run(self._fetch, guild_id, user_id)
+
+    async def clear(self, guild_id: int, user_id: int) -> int:
+        return await self._run(self._clear, guild_id, user_id)
+
+    async def count(self, guild_id: int, user_id: int) -> int:
+        return await self._run(self._count, guild_id, user_id)
+
+    async def page(self, guild_id: int, user_id: int, cursor: Any = None, limit: int = 5) -> tuple[list[dict], Any]:
+        return await self._run(self._page, guild_id, user_id, cursor, limit)
+
+    def close(self) -> None:
+        super().close()
+        self._db.close()
+
+
+# ------------- Journal backend ------------- #
+
+WARN_JOURNAL = DATA_DIR / "warnings.journal.jsonl"
+WARN_SNAPSHOT = DATA_DIR / "warnings.snapshot.json"
+
+FSYNC_ALWAYS = "always"      # fsync after every append
+FSYNC_INTERVAL = "interval"  # fsync at most every FSYNC_INTERVAL_SECONDS
+FSYNC_NEVER = "never"        # leave it to the OS
+FSYNC_INTERVAL_SECONDS = 1.0
+
+
+class JournalWarningsStore(_InMemoryStore, _ThreadedStore):
+    """
+    Append-only JSONL journal plus a periodically compacted snapshot.
+
+    - Every warn/clear is one appended line, so writes are O(1) no matter
+      how many warnings exist.
+    - At startup the snapshot is loaded and the journal replayed on top.
+    - Once the journal grows past `max_journal_bytes`, a background task
+      writes the in-memory state out as a new snapshot and truncates the
+      journal; the append that crossed the limit doesn't wait for it.
+    - Appends and compaction share one worker thread, so they stay ordered.
+    - With the "interval" fsync policy, a timer fsyncs the tail once appends
+      stop, so the last writes don't wait for close() to reach the disk.
+    """
+
+    def __init__(
+        self,
+        journal: Path = WARN_JOURNAL,
+        snapshot: Path = WARN_SNAPSHOT,
+        *,
+        fsync: str = FSYNC_INTERVAL,
+        max_journal_bytes: int = 1 << 20,
+    ):
+        super().__init__()
+        if fsync not in (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER):
+            raise ValueError(f"Unknown fsync policy: {fsync!r}")
+        self.journal = journal
+        self.snapshot = snapshot
+        self.fsync = fsync
+        self.max_journal_bytes = max_journal_bytes
+        self._last_fsync = 0.0
+        self._unsynced = False  # worker thread only
+        self._fsync_timer: asyncio.TimerHandle | None = None
+        self._compacting = False
+        self._compact_task: asyncio.Task | None = None
+        self.appends = 0
+        self.compactions = 0
+
+        journal.parent.mkdir(exist_ok=True)
+        if not snapshot.exists() and not journal.exists():
+            if WARN_FILE.exists():
+                # First run after switching from the JSON backend.
+                atomic_write_json(snapshot, load_json(WARN_FILE))
+                print(f"[warnings] Seeded {snapshot} from {WARN_FILE}.")
+            elif WARN_DB.exists():
+                print(
+                    f"[warnings] Starting an empty journal, but {WARN_DB} exists: warnings stored by "
+                    "the sqlite backend are not carried over to the journal backend."
+                )
+        self._data: dict = load_json(snapshot)
+        self._replay()
+        self._fh = journal.open("ab")
+        self._journal_bytes = self._fh.tell()
+
+    def _replay(self) -> None:
+        """
+        Apply the journal on top of the snapshot.
+
+        Anything after the last complete, readable line is a torn append
+        from a crash; it is cut off so the next append starts on a fresh
+        line instead of being glued onto the fragment.
+        """
+        if not self.journal.exists():
+            return
+        good_end = offset = 0
+        with self.journal.open("rb") as f:
+            for lineno, line in enumerate(f, start=1):
+                offset += len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    print(f"[warnings] Skipping unreadable journal line {lineno}.")
+                    continue
+                if not line.endswith(b"\n"):
+                    # Complete entry, but the crash hit before its newline.
+                    print(f"[warnings] Journal line {lineno} is incomplete; dropping it.")
+                    continue
+                self._apply(entry)
+                good_end = offset
+        if good_end < offset:
+            with self.journal.open("r+b") as f:
+                f.truncate(good_end)
+                os.fsync(f.fileno())
+            print(f"[warnings] Truncated {offset - good_end} byte(s) of torn journal tail.")
+
+    def _apply(self, entry: dict) -> int:
+        guild_key, user_key = str(entry["g"]), str(entry["u"])
+        if entry["op"] == "warn":
+            user_warnings = self._data.setdefault(guild_key, {}).setdefault(user_key, [])
+            user_warnings.append(entry["w"])
+            return len(user_warnings)
+        guild_warnings = self._data.get(guild_key, {})
+        removed = guild_warnings.pop(user_key, None) or []
+        if not guild_warnings:
+            self._data.pop(guild_key, None)
+        return len(removed)
+
+    def _append(self, line: bytes) -> bool:
+        """Write one line; returns True if it was left un-fsynced."""
+        self._fh.write(line)
+        self._fh.flush()
+        self._journal_bytes += len(line)
+        self.appends += 1
+        now = time.monotonic()
+        if self.fsync == FSYNC_ALWAYS or (
+            self.fsync == FSYNC_INTERVAL and now - self._last_fsync >= FSYNC_INTERVAL_SECONDS
+        ):
+            os.fsync(self._fh.fileno())
+            self._last_fsync = now
+            self._unsynced = False
+        else:
+            self._unsynced = True
+        return self._unsynced
+
+    def _sync_tail(self) -> None:
+        if self._unsynced:
+            os.fsync(self._fh.fileno())
+            self._last_fsync = time.monotonic()
+            self._unsynced = False
+
+    def _start_sync_tail(self) -> None:
+        self._fsync_timer = None
+        asyncio.get_running_loop().run_in_executor(self._executor, self._sync_tail)
+
+    def _compact(self, data: dict) -> None:
+        atomic_write_bytes(self.snapshot, json.dumps(data).encode("utf-8"))
+        self._fh.truncate(0)
+        self._fh.seek(0)
+        os.fsync(self._fh.fileno())
+        self._journal_bytes = 0
+        self._unsynced = False
+        self.compactions += 1
+
+    async def _record(self, entry: dict) -> int:
+        # State changes on the loop right away; the line follows in order.
+        result = self._apply(entry)
+        line = json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n"
+        unsynced = await self._run(self._append, line)
+        if unsynced and self.fsync == FSYNC_INTERVAL and self._fsync_timer is None:
+            self._fsync_timer = asyncio.get_running_loop().call_later(
+                FSYNC_INTERVAL_SECONDS, self._start_sync_tail
+            )
+        if self._journal_bytes > self.max_journal_bytes and not self._compacting:
+            self._compacting = True
+            self._compact_task = asyncio.create_task(self._compact_in_background())
+        return result
+
+    async def _compact_in_background(self) -> None:
+        try:
+            await self.compact()
+        except Exception as e:
+            print(f"[warnings] Journal compaction failed: {e}")
+
+    async def compact(self) -> None:
+        """Write a fresh snapshot and truncate the journal."""
+        self._compacting = True
+        try:
+            # Copied here, so appends queued behind this job on the worker
+            # thread land in the fresh journal. Warning dicts are never
+            # mutated, so only the containers need copying; the expensive
+            # serialization happens on the worker.
+            data = {g: {u: list(ws) for u, ws in users.items()} for g, users in self._data.items()}
+            await self._run(self._compact, data)
+        finally:
+            self._compacting = False
+
+    async def add(self, guild_id: int, user_id: int, warning: dict) -> int:
+        return await self._record({"op": "warn", "g": guild_id, "u": user_id, "w": warning})
+
+    async def clear(self, guild_id: int, user_id: int) -> int:
+        if not self._data.get(str(guild_id), {}).get(str(user_id)):
+            return 0
+        return await self._record({"op": "clear", "g": guild_id, "u": user_id})
+
+    def close(self) -> None:
+        if self._fsync_timer is not None:
+            self._fsync_timer.cancel()
+            self._fsync_timer = None
+        if self._compact_task is not None:
+            # Only stops one that hasn't reached the worker yet; a running
+            # one is waited for below.
+            self._compact_task.cancel()
+        super().close()
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._fh.close()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "appends": self.appends,
+            "compactions": self.compactions,
+            "journal_bytes": self._journal_bytes,
+        }
+
+
+def import_json_warnings(store: SqliteWarningsStore, path: Path = WARN_FILE) -> int:
+    """
+    One-shot import of a legacy warnings.json into an empty SQLite store.
+
+    The JSON file is renamed to *.imported afterwards so it isn't imported
+    twice. Returns the number of warnings imported.
+    """
+    if not path.exists() or not store.is_empty():
+        return 0
+    data = load_json(path)
+    count = store._import(data)
+    os.replace(path, path.with_name(path.name + ".imported"))
+    print(f"[warnings] Imported {count} warning(s) from {path} into {store.path}.")
+    return count
+
+
+def open_warnings_store(backend: str | None = None) -> WarningsStore:
+    """
+    Build the store selected by WARNINGS_BACKEND: "sqlite" (default), "journal" or "json".
+
+    The journal backend also reads WARNINGS_FSYNC (always/interval/never) and
+    WARNINGS_JOURNAL_MAX_BYTES.
+    """
+    backend = (backend or os.getenv("WARNINGS_BACKEND", "sqlite")).lower()
+    if backend == "json":
+        return JsonWarningsStore()
+    if backend == "journal":
+        return JournalWarningsStore(
+            fsync=os.getenv("WARNINGS_FSYNC", FSYNC_INTERVAL).lower(),
+            max_journal_bytes=int(os.getenv("WARNINGS_JOURNAL_MAX_BYTES", str(1 << 20))),
+        )
+    if backend == "sqlite":
+        store = SqliteWarningsStore()
+        import_json_warnings(store)
+        return store
+    raise ValueError(f"Unknown WARNINGS_BACKEND: {backend!r}")
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import sys
+import threading
+import time
+import traceback
+
+from . import metrics
+
+
+class LoopWatchdog:
+    """
+    Detects event loop stalls and reports what was blocking.
+
+    - A coroutine ticks every `interval` seconds and records how late each
+      tick ran (scheduling lag). With metrics enabled, each lag sample also
+      goes into metrics.LOOP_LAG.
+    - A daemon thread watches those ticks. When none has landed for
+      `threshold` seconds the loop is blocked, so it samples the loop
+      thread's stack (sys._current_frames) and logs it together with the
+      commands in flight. When the loop recovers, the stall's length is
+      logged.
+    - Every `latency_check` seconds, if the heartbeat latency (bot.latency)
+      is above `latency_warn` while lag also crossed the threshold in that
+      window, it warns; slow heartbeats plus lag usually mean the loop,
+      not the network, is the problem.
+    - `slow_callback`, if set, enables asyncio debug mode so asyncio itself
+      logs every callback slower than that many seconds.
+    """
+
+    def __init__(
+        self,
+        bot,
+        *,
+        threshold: float = 0.25,
+        interval: float = 0.1,
+        latency_warn: float = 1.0,
+        latency_check: float = 30.0,
+        slow_callback: float | None = None,
+    ):
+        self.bot = bot
+        self.threshold = threshold
+        self.interval = interval
+        self.latency_warn = latency_warn
+        self.latency_check = latency_check
+        self.slow_callback = slow_callback
+
+        self._last_tick = time.monotonic()
+        self._window_max_lag = 0.0
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._commands: dict[int, str] = {}  # interaction id -> command name
+
+        self.stalls = 0
+        self.max_lag = 0.0
+
+        for kind in ("slash", "user", "message"):
+            bot.add_listener(self._command_started, f"on_{kind}_command")
+            bot.add_listener(self._command_finished, f"on_{kind}_command_completion")
+
+    async def _command_started(self, inter) -> None:
+        self._commands[inter.id] = inter.application_command.qualified_name
+
+    async def _command_finished(self, inter) -> None:
+        self._commands.pop(inter.id, None)
+
+    def command_failed(self, inter) -> None:
+        self._commands.pop(inter.id, None)
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self.slow_callback is not None:
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.slow_callback
+            print(f"[watchdog] asyncio debug on, logging callbacks slower than {self.slow_callback * 1000:.0f}ms")
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._task = loop.create_task(self._tick())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _tick(self) -> None:
+        next_check = time.monotonic() + self.latency_check
+        while True:
+            before = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - before - self.interval)
+            self._last_tick = now
+            self._window_max_lag = max(self._window_max_lag, lag)
+            self.max_lag = max(self.max_lag, lag)
+            if metrics.enabled:
+                metrics.LOOP_LAG.observe(lag)
+
+            if now >= next_check:
+                next_check = now + self.latency_check
+                self._check_latency()
+
+    def _check_latency(self) -> None:
+        lag, self._window_max_lag = self._window_max_lag, 0.0
+        latency = self.bot.latency
+        if math.isfinite(latency) and latency > self.latency_warn and lag >= self.threshold:
+            print(
+                f"[watchdog] Heartbeat latency {latency * 1000:.0f}ms with event loop lag up to "
+                f"{lag * 1000:.0f}ms in the last {self.latency_check:.0f}s; the loop is likely being blocked."
+            )
+
+    def _watch(self) -> None:
+        stalled_since: float | None = None
+        while not self._stop.wait(self.interval):
+            behind = time.monotonic() - self._last_tick - self.interval
+            if behind >= self.threshold and stalled_since is None:
+                stalled_since = self._last_tick
+                self.stalls += 1
+                self._report_stall(behind)
+            elif behind < self.threshold and stalled_since is not None:
+                print(f"[watchdog] Event loop recovered after {self._last_tick - stalled_since:.2f}s.")
+                stalled_since = None
+
+    def _report_stall(self, behind: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else "  <no frame>\n"
+        commands = ", ".join(sorted(set(self._commands.values()))) or "none"
+        print(
+            f"[watchdog] Event loop blocked for {behind * 1000:.0f}ms+ "
+            f"(commands in flight: {commands}). Loop thread stack:\n{stack}",
+            end="",
+        )
+
+    def stats(self) -> dict[str, float | int]:
+        return {"stalls": self.stalls, "max_lag": self.max_lag}